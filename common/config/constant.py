@@ -2,12 +2,61 @@ import json
 import os
 import threading
 from datetime import timedelta
-from typing import Dict, Generic, Optional, Type, TypeVar
+from operator import attrgetter
+from typing import Any, Callable, Dict, Generic, List, Optional, Type, TypeVar
 
 T = TypeVar("T")
 
+# os.environ.get goes through the _Environ mapping wrapper (encode key, decode value)
+# on every call; constants are resolved at import time so a plain dict copy is enough.
+# Call Constant.refresh_env_snapshot() after mutating the environment at runtime.
+_ENV_SNAPSHOT: Dict[str, str] = dict(os.environ)
+
+# Common spellings are listed so the usual cases match without allocating a lowercased copy
+_TRUTHY = frozenset(("true", "1", "yes", "on", "TRUE", "True", "YES", "Yes", "ON", "On"))
+
+
+def _to_bool(env_value: str) -> bool:
+    return env_value in _TRUTHY or env_value.lower() in _TRUTHY
+
+
+def _split_csv(env_value: str) -> List[str]:
+    # Try to parse as comma-separated values
+    if not env_value or env_value.isspace():
+        return []
+
+    # Only pay for a stripped copy when there is surrounding whitespace
+    first, last = env_value[0], env_value[-1]
+    if first.isspace() or last.isspace():
+        stripped_value = env_value.strip()
+        first, last = stripped_value[0], stripped_value[-1]
+
+    # If it looks like a JSON array, treat it as a single item
+    if first == "[" and last == "]":
+        return [env_value]
+
+    return [item.strip() for item in env_value.split(",")]
+
+
+def _to_timedelta(env_value: str) -> timedelta:
+    return timedelta(seconds=int(env_value))
+
+
+# Converters from an environment variable string, keyed by the type of the default value
+_CONVERTERS: Dict[type, Callable[[str], Any]] = {
+    str: str,
+    int: int,
+    float: float,
+    bool: _to_bool,
+    list: _split_csv,
+    dict: json.loads,
+    timedelta: _to_timedelta,
+}
+
 
 class Constant(Generic[T]):
+    __slots__ = "_env_var", "_default_value", "_value", "_initialized"
+
     _instances: Dict[str, "Constant[T]"] = {}
     _lock = threading.Lock()
 
@@ -15,27 +64,37 @@ class Constant(Generic[T]):
         if identifier is None:
             identifier = str(id(default_value))
 
+        instance = cls._instances.get(identifier)
+        if instance is not None:
+            return instance
+
         with cls._lock:
-            if identifier not in cls._instances:
+            instance = cls._instances.get(identifier)
+            if instance is None:
                 instance = super().__new__(cls)
-                cls._instances[identifier] = instance
                 instance._initialized = False  # type: ignore
-            return cls._instances[identifier]
+                cls._instances[identifier] = instance
+            return instance
 
     def __init__(self, default_value: T, identifier: Optional[str] = None, env_var: Optional[str] = None):
         if not hasattr(self, "_initialized") or not self._initialized:  # type: ignore
             self._env_var = env_var
             self._default_value = default_value
             self._value = self._get_initial_value()
-            self._value_lock = threading.RLock()
             self._initialized = True
 
+    @classmethod
+    def refresh_env_snapshot(cls) -> None:
+        """Re-read os.environ for constants created from now on."""
+        global _ENV_SNAPSHOT
+        _ENV_SNAPSHOT = dict(os.environ)
+
     def _get_initial_value(self) -> T:
         """Get the initial value, checking environment variable first if specified."""
         if self._env_var is None:
             return self._default_value
 
-        env_value = os.environ.get(self._env_var)
+        env_value = _ENV_SNAPSHOT.get(self._env_var)
         if env_value is None:
             return self._default_value
 
@@ -50,36 +109,13 @@ class Constant(Generic[T]):
         if default_value is None:
             return env_value  # type: ignore
 
-        default_type = type(default_value)
+        converter = _CONVERTERS.get(type(default_value))
+        if converter is None:
+            # For other types, return the string and let the user handle conversion
+            return env_value  # type: ignore
 
         try:
-            if default_type == str:
-                return env_value  # type: ignore
-            elif default_type == int:
-                return int(env_value)  # type: ignore
-            elif default_type == float:
-                return float(env_value)  # type: ignore
-            elif default_type == bool:
-                return env_value.lower() in ("true", "1", "yes", "on")  # type: ignore
-            elif default_type == list:
-                # Try to parse as comma-separated values
-                if not env_value.strip():
-                    return []  # type: ignore
-
-                # If it looks like a JSON array, treat it as a single item
-                stripped_value = env_value.strip()
-                if stripped_value.startswith("[") and stripped_value.endswith("]"):
-                    return [env_value]  # type: ignore
-
-                return [item.strip() for item in env_value.split(",")]  # type: ignore
-            elif default_type == dict:
-                # Try to parse as JSON-like string
-                return json.loads(env_value)  # type: ignore
-            elif default_type == timedelta:
-                return timedelta(seconds=int(env_value))  # type: ignore
-            else:
-                # For other types, return the string and let the user handle conversion
-                return env_value  # type: ignore
+            return converter(env_value)
         except (ValueError, json.JSONDecodeError):
             # If conversion fails, return the default value
             return default_value
@@ -88,16 +124,11 @@ class Constant(Generic[T]):
         return self._value
 
     def set(self, new_value: T) -> None:
-        with self._value_lock:
-            self._value = new_value
+        # Rebinding a single attribute is atomic under the GIL, no lock needed
+        self._value = new_value
 
     def __call__(self) -> T:
-        return self.get()
-
-    @property
-    def value(self) -> T:
-        return self.get()
+        return self._value
 
-    @value.setter
-    def value(self, new_value: T) -> None:
-        self.set(new_value)
+    # attrgetter keeps reads on the C-level descriptor path instead of a Python frame
+    value = property(attrgetter("_value"), set)
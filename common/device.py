@@ -1,12 +1,18 @@
+import functools
+
 from common.log import get_logger
 
 logger = get_logger(__name__)
 
 
+@functools.cache
 def best_device():
     """In the following order mps (m1 macs), cuda, cpu (default)
     return the first available device detected
 
+    The result is memoized: device detection (and the torch import) only
+    happens on the first call.
+
     Returns:
         torch.device: the detected torch device
     """
@@ -1,13 +1,16 @@
+import functools
 import logging
 import sys
 
+# Every module logs to stdout with the same format, so one handler is shared by all loggers
+_handler = logging.StreamHandler(sys.stdout)
+_handler.setFormatter(logging.Formatter("%(name)s %(levelname)s: %(message)s"))
 
+
+@functools.cache
 def get_logger(name: str, lvl: int = logging.DEBUG) -> logging.Logger:
     log = logging.getLogger(name)
     log.setLevel(lvl)
     if not log.hasHandlers():
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter("%(name)s %(levelname)s: %(message)s")
-        handler.setFormatter(formatter)
-        log.addHandler(handler)
+        log.addHandler(_handler)
     return log
@@ -1,13 +1,18 @@
+import threading
 from typing import Dict
 
 
 class Singleton(type):
     _instances: Dict = {}
-
-    def found(cls) -> bool:
-        return cls._instances.get(cls) is not None
+    # Reentrant so a singleton may construct another singleton in its __init__
+    _lock = threading.RLock()
 
     def __call__(cls, *args, **kwargs):
-        if not cls.found():
-            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
-        return cls._instances[cls]
+        instance = cls._instances.get(cls)
+        if instance is None:
+            with Singleton._lock:
+                instance = cls._instances.get(cls)
+                if instance is None:
+                    instance = super(Singleton, cls).__call__(*args, **kwargs)
+                    cls._instances[cls] = instance
+        return instance
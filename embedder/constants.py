@@ -1,15 +1,23 @@
 """Constants used throughout the embedder module."""
 
+import functools
+import os
 from datetime import timedelta
 from pathlib import Path
 
 from common.config.constant import Constant
 
-APP_DIR = Constant(f"{Path.home()}/.mcp-brag", env_var="MCP_RAG_APP_DIR")
+APP_DIR = Constant(os.path.join(os.path.expanduser("~"), ".mcp-brag"), env_var="MCP_RAG_APP_DIR")
+
+
+@functools.lru_cache(maxsize=1)
+def _app_dir_path(app_dir: str) -> Path:
+    return Path(app_dir)
 
 
 def app_dir_path() -> Path:
-    return Path(APP_DIR.value)
+    # keyed on the current value so APP_DIR.set() is still honoured
+    return _app_dir_path(APP_DIR.value)
 
 
 # Vectorizer configuration
@@ -1,7 +1,7 @@
-import time
+import random
 from datetime import timedelta
-from queue import Empty, Full, Queue
-from threading import Lock
+from itertools import islice
+from queue import Full, Queue
 from typing import Callable, Generic, List, Optional, TypeVar
 
 from common.log import get_logger
@@ -19,21 +19,30 @@ logger = get_logger(__name__)
 
 T = TypeVar("T")
 
+# First wait after an empty read, doubled on every further empty read up to the read sleep time
+MIN_READ_BACKOFF = timedelta(microseconds=100)
+
 
 class BulkQueue(Generic[T]):
     """A thread-safe queue implementation optimized for efficient bulk read/write operations.
 
     This queue wraps the standard Queue class and provides atomic bulk operations
     to reduce lock contention and improve performance for batch processing scenarios.
+    Bulk operations work on the Queue's own mutex and deque directly, so a batch
+    costs a single lock acquisition instead of one per item.
 
     The queue supports:
     - Thread-safe single item operations (put_nowait, get_nowait)
     - Atomic bulk operations (put_many, get_many)
     - Standard queue operations (task_done, qsize)
 
+    The consumer is only woken when the queue was empty before a put or when it
+    announced it went to sleep (mark_consumer_asleep or an empty get_many), so
+    a consumer that is already draining the queue is not woken on every put.
+
     Attributes:
         _queue: The underlying Queue instance
-        _lock: Thread lock for ensuring atomic bulk operations
+        _consumer_awake: Whether the consumer was woken and has not gone idle since
     """
 
     def __init__(self, maxsize: int = 100, wake_consumer_function: Optional[Callable[[], None]] = None) -> None:
@@ -43,8 +52,8 @@ class BulkQueue(Generic[T]):
             maxsize: Maximum queue size. 0 means unlimited size.
         """
         self._queue: Queue[T] = Queue(maxsize=maxsize)
-        self._lock = Lock()
         self._wake_consumer_function = wake_consumer_function
+        self._consumer_awake = False
 
     def put_nowait(self, item: T) -> None:
         """Put an item into the queue without waiting.
@@ -55,7 +64,7 @@ class BulkQueue(Generic[T]):
         Raises:
             queue.Full: If queue is full and cannot accept the item
         """
-        self.wake_consumer()
+        self._wake_consumer_if_idle()
         self._queue.put_nowait(item)
 
     def set_wake_consumer_function(self, wake_consumer_function: Callable[[], None]) -> None:
@@ -71,9 +80,23 @@ class BulkQueue(Generic[T]):
         """
         Wake up the consumer thread when queue is not empty
         """
+        self._consumer_awake = True
         if self._wake_consumer_function:
             self._wake_consumer_function()
 
+    def mark_consumer_asleep(self) -> None:
+        """
+        Record that the consumer stopped draining the queue, so the next put wakes it
+        """
+        self._consumer_awake = False
+
+    def _wake_consumer_if_idle(self) -> None:
+        """
+        Wake up the consumer only on the empty to non-empty edge or if it went idle
+        """
+        if not self._consumer_awake or self._queue.empty():
+            self.wake_consumer()
+
     def get_nowait(self) -> T:
         """Get an item from the queue without waiting.
 
@@ -85,15 +108,15 @@ class BulkQueue(Generic[T]):
         """
         return self._queue.get_nowait()
 
-    def put_many(self, items: List[T], _retry_count: int = 0) -> None:
+    def put_many(self, items: List[T]) -> None:
         """Put multiple items into the queue atomically with retry logic.
 
-        This method attempts to put all items into the queue atomically. If the queue
-        becomes full during the operation, it will retry with exponential backoff.
+        Items are appended to the underlying deque in as few critical sections as
+        possible: one acquisition of the queue mutex per attempt, rather than one per
+        item. If the queue becomes full, it waits for space with exponential backoff.
 
         Args:
             items: List of items to put in the queue
-            _retry_count: Internal parameter for tracking retry attempts
 
         Raises:
             queue.Full: If queue doesn't have space for all items after all retries
@@ -101,26 +124,34 @@ class BulkQueue(Generic[T]):
         if not items:  # Early return for empty list
             return
 
-        with self._lock:
-            remaining_items = list(items)  # Create a copy to avoid modifying original
-            self.wake_consumer()
-
-            for i, item in enumerate(remaining_items):
-                try:
-                    self._queue.put_nowait(item)
-                except Full:
-                    # Remove successfully added items and retry with remaining
-                    remaining_items = remaining_items[i:]
-
-                    if _retry_count < BULK_QUEUE_FULL_RETRY_COUNT.value:
-                        # Exponential backoff with jitter
-                        sleep_time = min(BULK_QUEUE_FULL_SLEEP_TIME.value * (2**_retry_count), 1.0)
-                        time.sleep(sleep_time)
-                        # Recursive call with remaining items only
-                        self.put_many(remaining_items, _retry_count + 1)
-                        return
-                    else:
-                        raise Full("Queue remained full after maximum retry attempts")
+        self._wake_consumer_if_idle()
+
+        queue = self._queue
+        # Track progress by index so retries never copy the remaining items
+        index = 0
+        retry_count = 0
+        while True:
+            with queue.not_full:
+                count = len(items) - index
+                if queue.maxsize > 0:
+                    count = min(count, queue.maxsize - len(queue.queue))
+                if count > 0:
+                    # Everything fitting on the first attempt is the common case, skip the slice then
+                    queue.queue.extend(items if count == len(items) else islice(items, index, index + count))
+                    queue.unfinished_tasks += count
+                    queue.not_empty.notify(count)
+                    index += count
+
+                if index >= len(items):
+                    return
+                if retry_count >= BULK_QUEUE_FULL_RETRY_COUNT.value:
+                    raise Full("Queue remained full after maximum retry attempts")
+
+                # Exponential backoff with jitter, waiting releases the mutex
+                # and a consumer freeing space wakes us up early
+                sleep_time = min(BULK_QUEUE_FULL_SLEEP_TIME.value * (2**retry_count), 1.0)
+                queue.not_full.wait(sleep_time + random.uniform(0, sleep_time / 10))
+            retry_count += 1
 
     def get_many(self, max_items: int) -> List[T]:
         """Get multiple items from the queue atomically.
@@ -138,15 +169,32 @@ class BulkQueue(Generic[T]):
         if max_items <= 0:
             raise ValueError("max_items must be positive")
 
-        items = []
-        with self._lock:
-            for _ in range(max_items):
-                try:
-                    items.append(self._queue.get_nowait())
-                except Empty:
-                    break
+        queue = self._queue
+        with queue.mutex:
+            buffer = queue.queue
+            count = min(max_items, len(buffer))
+            if count == 0:
+                self._consumer_awake = False
+                return []
+            items = [buffer.popleft() for _ in range(count)]
+            queue.not_full.notify(count)
         return items
 
+    def wait_not_empty(self, timeout: float) -> bool:
+        """Wait until the queue has items or the timeout expires.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if the queue has items, False if the timeout expired first
+        """
+        queue = self._queue
+        with queue.not_empty:
+            if not queue.queue:
+                queue.not_empty.wait(timeout)
+            return bool(queue.queue)
+
     def get_one(self) -> Optional[T]:
         """
         Get one item from the queue without waiting
@@ -167,6 +215,30 @@ class BulkQueue(Generic[T]):
         """
         self._queue.task_done()
 
+    def task_done_many(self, count: int) -> None:
+        """Mark several tasks as done at once.
+
+        Equivalent to calling task_done() count times, but takes the queue's
+        task lock only once.
+
+        Args:
+            count: Number of tasks to mark as done
+
+        Raises:
+            ValueError: If called more times than there were items placed in the queue
+        """
+        if count <= 0:
+            return
+
+        queue = self._queue
+        with queue.all_tasks_done:
+            unfinished = queue.unfinished_tasks - count
+            if unfinished < 0:
+                raise ValueError("task_done_many() called too many times")
+            if unfinished == 0:
+                queue.all_tasks_done.notify_all()
+            queue.unfinished_tasks = unfinished
+
     def qsize(self) -> int:
         """Return the approximate size of the queue.
 
@@ -210,7 +282,8 @@ class BulkQueueReadWriter:
         _read_queue: Queue for reading text inputs
         _write_queue: Queue for writing text outputs
         _batch_size: Maximum number of items to read in one operation
-        _sleep_time: Time to sleep when read queue is empty
+        _sleep_time: Longest time to wait when read queue is empty
+        _read_backoff: Time the next empty read will wait for items
     """
 
     def __init__(
@@ -228,6 +301,7 @@ class BulkQueueReadWriter:
         self._write_queue = write_queue or BulkQueue(maxsize=ASYNC_QUEUE_MAX_SIZE.value)
         self._batch_size = ASYNC_QUEUE_BATCH_SIZE.value
         self._sleep_time = ASYNC_QUEUE_READ_SLEEP.value
+        self._read_backoff = min(MIN_READ_BACKOFF, self._sleep_time)
 
         logger.debug(
             "BulkQueueReadWriter initialized with "
@@ -240,8 +314,9 @@ class BulkQueueReadWriter:
         """Read a batch of text inputs from the read queue.
 
         Attempts to read up to batch_size items from the queue. If no items
-        are available and sleep_time is configured, will sleep to avoid
-        busy waiting.
+        are available and sleep_time is configured, waits for items to be put
+        in the queue, backing off exponentially up to sleep_time on repeated
+        empty reads to avoid busy waiting.
 
         Returns:
             TextBatch containing the retrieved items. May be empty if no
@@ -250,13 +325,15 @@ class BulkQueueReadWriter:
         # Try to read multiple items at once for better performance
         items = self._read_queue.get_many(self._batch_size)
 
-        # Mark each retrieved item as done for proper queue lifecycle management
-        for _ in items:
-            self._read_queue.task_done()
+        # Mark the retrieved items as done for proper queue lifecycle management
+        self._read_queue.task_done_many(len(items))
 
-        # Sleep only if no items were retrieved and sleep is configured
-        if not items and self._sleep_time > timedelta():
-            time.sleep(self._sleep_time.total_seconds())
+        if items:
+            self._read_backoff = min(MIN_READ_BACKOFF, self._sleep_time)
+        elif self._sleep_time > timedelta():
+            # Wait only if no items were retrieved and sleep is configured, a put wakes us up early
+            self._read_queue.wait_not_empty(self._read_backoff.total_seconds())
+            self._read_backoff = min(self._read_backoff * 2, self._sleep_time)
 
         return TextBatch(items)
 
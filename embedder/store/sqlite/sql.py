@@ -2,8 +2,11 @@ import json
 import os
 import sqlite3
 import threading
+from collections import defaultdict
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from itertools import repeat
+from typing import Any, DefaultDict, Dict, Iterator, List, Optional, Tuple
 from uuid import uuid4
 
 import numpy as np
@@ -17,6 +20,21 @@ from embedder.store.store import CollectionState, DataSourceStats, RelevantColle
 
 logger = get_logger(__name__)
 
+# Unit vectors are scaled by 127 * int8_scale(dim) and rounded before being stored as int8,
+# a component of a random unit vector rarely exceeds INT8_CLIP_STDDEVS standard deviations
+# (1 / sqrt(dim)) so larger ones are clipped rather than wasting the int8 range on them
+INT8_CLIP_STDDEVS = 4.0
+# Searches shortlist this many candidates per requested result on the int8 vectors
+# (at least MIN_RERANK_CANDIDATES) before reranking them on the float vectors
+RERANK_CANDIDATES_FACTOR = 4
+MIN_RERANK_CANDIDATES = 100
+# Largest k sqlite-vec accepts for a KNN query
+MAX_KNN_K = 4096
+# Prepared statements kept per connection, keyed by SQL text (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+# Rows copied per batch when rebuilding the embeddings table
+MIGRATION_BATCH_SIZE = 1000
+
 
 # from sqlean.dbapi2.Row
 # sqlean is a wrapper around sqlite3 that allows for loading extensions
@@ -29,31 +47,67 @@ def get_sqlite_connection() -> sqlite3.Connection:
 
     # Use a file-based database to allow sharing between threads
     # Using WAL mode for better concurrency
-    conn = sqlean.connect(SQLITE_DB_LOCATION.value, check_same_thread=False)
+    conn = sqlean.connect(SQLITE_DB_LOCATION.value, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
     conn.enable_load_extension(True)
     sqlite_vec.load(conn)
     conn.enable_load_extension(False)
     conn.row_factory = sqlean.Row
     # Enable WAL mode for better concurrent access
     conn.execute("PRAGMA journal_mode=WAL")
+    # WAL only needs to sync on checkpoints to stay consistent
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Connections from other threads may hold the write lock, wait for it instead of failing
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # 64MB page cache per connection (negative values are in KiB)
+    conn.execute("PRAGMA cache_size=-64000")
+    conn.execute("PRAGMA mmap_size=268435456")
     return conn
 
 
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run the statements of one unit of work in a single transaction.
+
+    The helpers below never commit, callers group them with this so a batch of
+    writes costs one WAL commit. Nested uses join the enclosing transaction.
+
+    Args:
+        conn: SQLite connection
+
+    Yields:
+        The same connection
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+
+    # Take the write lock up front instead of upgrading a read lock mid-transaction
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
 class SqliteConnInstance(metaclass=Singleton):
-    _connection = None
-    _lock = threading.Lock()
+    # One connection per thread so readers are not serialized behind the writer,
+    # WAL mode lets them all work on the same database file concurrently
+    _local = threading.local()
 
     def __init__(self):
         pass
 
     @property
     def conn(self) -> sqlite3.Connection:
-        """Get a shared SQLite connection with thread safety."""
-        if self._connection is None:
-            with self._lock:
-                if self._connection is None:
-                    self._connection = get_sqlite_connection()
-        return self._connection
+        """Get the calling thread's SQLite connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = get_sqlite_connection()
+            self._local.connection = connection
+        return connection
 
 
 @dataclass
@@ -79,7 +133,7 @@ class SqliteEmbeddingRow:
             id=row["id"],
             collection=row["collection"],
             text=row["text"],
-            embedding=np.array(json.loads(row["embedding"]), dtype=np.float32),
+            embedding=parse_embedding_from_sqlite(row["embedding"]),
             metadata=json.loads(row["metadata"]) if row["metadata"] and row["metadata"] != "{}" else None,
         )
 
@@ -94,7 +148,7 @@ class SqliteEmbeddingRowWithDistance(SqliteEmbeddingRow):
             id=row["id"],
             collection=row["collection"],
             text=row["text"],
-            embedding=np.array(json.loads(row["embedding"]), dtype=np.float32),
+            embedding=parse_embedding_from_sqlite(row["embedding"]),
             metadata=json.loads(row["metadata"]) if row["metadata"] and row["metadata"] != "{}" else None,
             distance=row["distance"],
         )
@@ -125,15 +179,43 @@ class SqliteRelevantCollectionRow:
         )
 
 
-def format_embedding_for_sqlite(embedding: np.ndarray) -> str:
-    return "[" + ",".join(f"{x:.12f}" for x in embedding) + "]"
+def format_embedding_for_sqlite(embedding: np.ndarray) -> bytes:
+    # sqlite-vec reads a BLOB of little-endian float32 values as a vector,
+    # which skips formatting and parsing a JSON string for every embedding
+    return np.asarray(embedding, dtype=np.float32).tobytes()
 
 
-def format_sources_for_sqlite(sources: List[str]) -> str:
-    return ",".join(f"'{source}'" for source in sources)
+def parse_embedding_from_sqlite(embedding: bytes) -> np.ndarray:
+    # Read-only view over the BLOB returned by sqlite, no copy or parsing needed
+    return np.frombuffer(embedding, dtype=np.float32)
 
 
-def initialize_sqlite_tables(conn: sqlite3.Connection, embedding_dim: int) -> None:
+def int8_scale(embedding_dim: int) -> float:
+    # L2 distances between int8 vectors are this many times the distances between float vectors
+    return 127.0 * max(1.0, np.sqrt(embedding_dim) / INT8_CLIP_STDDEVS)
+
+
+def quantize_embeddings_int8(embeddings: np.ndarray) -> np.ndarray:
+    # Normalize first: the embedder outputs unit vectors but rows stored before it did may not be.
+    # Rounding rather than truncating keeps int8 distances unbiased
+    matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    scaled = np.rint(matrix / norms * int8_scale(matrix.shape[1]))
+    return np.clip(scaled, -127, 127).astype(np.int8).reshape(np.shape(embeddings))
+
+
+def format_sources_clause_for_sqlite(column: str, sources: Optional[List[str]]) -> Tuple[str, Tuple[str, ...]]:
+    if not sources:
+        return "", ()
+    # The whole list is bound as one JSON array, so the SQL text does not change
+    # with the number of sources and the cached statement is reused
+    return f"AND {column} IN (SELECT value FROM json_each(?))", (json.dumps(sources),)
+
+
+def _create_embeddings_table(conn: sqlite3.Connection, embedding_dim: int) -> None:
+    # embedding_int8 is a quantized copy of embedding, 4x smaller to scan when
+    # ranking collections, embedding keeps full precision for search results
     conn.execute(
         f"""
             CREATE VIRTUAL TABLE IF NOT EXISTS embeddings USING vec0(
@@ -141,11 +223,43 @@ def initialize_sqlite_tables(conn: sqlite3.Connection, embedding_dim: int) -> No
                 collection TEXT NOT NULL,
                 text TEXT NOT NULL,
                 embedding FLOAT[{embedding_dim}],
+                embedding_int8 INT8[{embedding_dim}],
                 metadata TEXT
             );
         """
     )
 
+
+def _migrate_embeddings_table(conn: sqlite3.Connection, embedding_dim: int) -> None:
+    # vec0 tables cannot be altered, rebuild tables created before embedding_int8 existed
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(embeddings)").fetchall()}
+    if not columns or "embedding_int8" in columns:
+        return
+
+    logger.info("Adding quantized embeddings to the embeddings table")
+    with transaction(conn):
+        _rebuild_embeddings_table(conn, embedding_dim)
+
+
+def _rebuild_embeddings_table(conn: sqlite3.Connection, embedding_dim: int) -> None:
+    conn.execute(
+        """
+        CREATE TEMP TABLE embeddings_legacy AS
+        SELECT id, collection, text, embedding, metadata FROM embeddings;
+        """
+    )
+    conn.execute("DROP TABLE embeddings;")
+    _create_embeddings_table(conn, embedding_dim)
+    cursor = conn.execute("SELECT id, collection, text, embedding, metadata FROM embeddings_legacy;")
+    while rows := cursor.fetchmany(MIGRATION_BATCH_SIZE):
+        insert_embeddings(conn, [SqliteEmbeddingRow.from_row(row) for row in rows])
+    conn.execute("DROP TABLE embeddings_legacy;")
+
+
+def initialize_sqlite_tables(conn: sqlite3.Connection, embedding_dim: int) -> None:
+    _migrate_embeddings_table(conn, embedding_dim)
+    _create_embeddings_table(conn, embedding_dim)
+
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS collections (
@@ -157,6 +271,9 @@ def initialize_sqlite_tables(conn: sqlite3.Connection, embedding_dim: int) -> No
         );
         """
     )
+    # Collections are looked up by path and by name, never by id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_collections_source_path ON collections(source_path);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_collections_source_name ON collections(source_name);")
 
 
 def get_embedding_row_by_id(
@@ -164,7 +281,7 @@ def get_embedding_row_by_id(
 ) -> Optional[SqliteEmbeddingRow]:
     cursor = conn.execute(
         """
-        SELECT id, collection, text, vec_to_json(embedding) as embedding, metadata
+        SELECT id, collection, text, embedding, metadata
         FROM embeddings
         WHERE id = ? AND (collection = ? OR ? IS NULL)
         LIMIT 1;
@@ -180,24 +297,30 @@ def get_embedding_row_by_id(
 def search_embeddings(
     conn: sqlite3.Connection, query: np.ndarray, k: int, sources: Optional[List[str]] = None
 ) -> List[SqliteEmbeddingRowWithDistance]:
-    if sources is None or len(sources) == 0:
-        sources_clause = ""
-        params = [format_embedding_for_sqlite(query), k]
-    else:
-        sources_clause = f"AND collection IN ({','.join(['?' for _ in range(len(sources))])})"
-        params = [format_embedding_for_sqlite(query), *sources, k]
+    sources_clause, sources_params = format_sources_clause_for_sqlite("collection", sources)
+    query_blob = format_embedding_for_sqlite(query)
+    candidates = min(max(k * RERANK_CANDIDATES_FACTOR, MIN_RERANK_CANDIDATES), MAX_KNN_K)
+    params = (quantize_embeddings_int8(query).tobytes(), candidates, *sources_params, query_blob, k)
 
+    # Shortlist on the int8 vectors (a quarter of the bytes to scan), then rank the
+    # shortlist by exact distance to the float vectors
     cursor = conn.execute(
         f"""
-        SELECT id, collection, text, vec_to_json(embedding) as embedding, metadata, distance
-        FROM embeddings
-        WHERE
-            embedding match ?
-            AND collection <> 'user-query'
-            {sources_clause}
+        WITH candidates AS MATERIALIZED (
+            SELECT id, collection, text, embedding, metadata
+            FROM embeddings
+            WHERE
+                embedding_int8 MATCH vec_int8(?)
+                AND k = ?
+                AND collection <> 'user-query'
+                {sources_clause}
+        )
+        SELECT id, collection, text, embedding, metadata, vec_distance_l2(embedding, ?) AS distance
+        FROM candidates
+        ORDER BY distance
         LIMIT ?;
         """,
-        tuple(params),
+        params,
     )
     rows = cursor.fetchall()
     return [SqliteEmbeddingRowWithDistance.from_row(row) for row in rows]
@@ -210,37 +333,36 @@ def search_relevant_collections(
     sources: Optional[List[str]] = None,
     distance_threshold: float = 10.0,
 ) -> List[SqliteRelevantCollectionRow]:
-    if sources is None or len(sources) == 0:
-        sources_clause = ""
-        params = [format_embedding_for_sqlite(query), distance_threshold, k]
-    else:
-        sources_clause = f"AND collection IN ({','.join(['?' for _ in range(len(sources))])})"
-        params = [format_embedding_for_sqlite(query), distance_threshold, *sources, k]
+    sources_clause, sources_params = format_sources_clause_for_sqlite("collection", sources)
+    scale = int8_scale(len(query))
+    params = (quantize_embeddings_int8(query).tobytes(), distance_threshold * scale, *sources_params, scale, scale, k)
+    # Ranking collections only needs approximate distances, scan the int8 vectors
+    # and scale the distances back to the float embedding space
     cursor = conn.execute(
         f"""
-            WITH results AS (
+            WITH results AS MATERIALIZED (
                 SELECT
                     collection,
                     distance
                 FROM embeddings
                 WHERE
-                    embedding MATCH ?
-                    AND k = 4096
+                    embedding_int8 MATCH vec_int8(?)
+                    AND k = {MAX_KNN_K}
                     AND distance < ?
                     AND collection <> 'user-query'
                     {sources_clause}
-                ORDER BY distance
             )
             SELECT
                 collection,
-                MIN(distance) AS min_distance,
-                AVG(distance) AS avg_distance,
+                MIN(distance) / ? AS min_distance,
+                AVG(distance) / ? AS avg_distance,
                 COUNT(*) AS count
             FROM results
             GROUP BY collection
+            ORDER BY min_distance
             LIMIT ?;
         """,
-        tuple(params),
+        params,
     )
     return [SqliteRelevantCollectionRow.from_row(row) for row in cursor.fetchall()]
 
@@ -256,68 +378,44 @@ def get_collection_sources(conn: sqlite3.Connection) -> List[str]:
 
 def get_collections_details(conn: sqlite3.Connection, collections: Optional[List[str]] = None) -> List[DataSourceStats]:
     if collections is None:
-        cursor = conn.execute(
-            """
-            SELECT id, source_name, source_path, source_type, state
-            FROM collections
-            """
-        )
-    else:
-        cursor = conn.execute(
-            """
-            SELECT id, source_name, source_path, source_type, state
-            FROM collections
-            WHERE source_path IN (?)
-            """,
-            collections,
-        )
-    return _get_collections_details(conn, cursor)
+        return _get_collections_details(conn, "1", ())
+    # Bind the sources as one JSON array so the statement text is the same for any number of sources
+    return _get_collections_details(conn, "source_path IN (SELECT value FROM json_each(?))", (json.dumps(collections),))
 
 
 def get_collections_details_by_name(conn: sqlite3.Connection, source_name: str) -> List[DataSourceStats]:
+    return _get_collections_details(conn, "source_name = ?", (source_name,))
+
+
+def _get_collections_details(
+    conn: sqlite3.Connection, collections_filter: str, params: Tuple[Any, ...]
+) -> List[DataSourceStats]:
+    # Collections and their vector counts in a single round-trip, the filter is
+    # repeated in the subquery so only the selected collections' embeddings are counted
     cursor = conn.execute(
-        """
-        SELECT id, source_name, source_path, source_type, state
-        FROM collections
-        WHERE source_name = ?
-        """,
-        (source_name,),
-    )
-    return _get_collections_details(conn, cursor)
-
-
-def _get_collections_details(conn: sqlite3.Connection, cursor: sqlite3.Cursor) -> List[DataSourceStats]:
-    collections_from_db: Dict = {row["source_path"]: row for row in cursor.fetchall()}
-    collection_sources = list(collections_from_db.keys())
-    stats: Dict[str, Dict[str, Any]] = {}
-    if collection_sources:
-        placeholders = ",".join("?" * len(collection_sources))
-        stats = {
-            row["collection"]: dict(row)
-            for row in conn.execute(
-                f"""
-            SELECT collection, COUNT(*) as vector_count
+        f"""
+        SELECT c.source_name, c.source_path, c.state, COALESCE(e.vector_count, 0) AS vector_count
+        FROM collections c
+        LEFT JOIN (
+            SELECT collection, COUNT(*) AS vector_count
             FROM embeddings
-            WHERE collection IN ({placeholders})
+            WHERE collection IN (SELECT source_path FROM collections WHERE {collections_filter})
             GROUP BY collection
-            """,
-                collection_sources,
-            ).fetchall()
-        }
-
-    collection_with_stats = []
-    for collection_source, collection in collections_from_db.items():
-        stat = stats.get(collection_source, {})
-        collection_with_stats.append(
-            DataSourceStats(
-                source_name=collection["source_name"],
-                source_path=collection["source_path"],
-                status=collection["state"],
-                vector_count=stat.get("vector_count", 0),
-                dimension=EMBEDDING_SIZE.value,  # TODO: get dimension from the collection
-            )
+        ) e ON e.collection = c.source_path
+        WHERE {collections_filter}
+        """,
+        params + params,
+    )
+    return [
+        DataSourceStats(
+            source_name=row["source_name"],
+            source_path=row["source_path"],
+            status=row["state"],
+            vector_count=row["vector_count"],
+            dimension=EMBEDDING_SIZE.value,  # TODO: get dimension from the collection
         )
-    return collection_with_stats
+        for row in cursor
+    ]
 
 
 def create_collection(
@@ -329,7 +427,6 @@ def create_collection(
         """,
         (str(uuid4()), source_name, source_path, source_type, state),
     )
-    conn.commit()
 
 
 def delete_collection(conn: sqlite3.Connection, source_path: str):
@@ -345,37 +442,51 @@ def delete_collection(conn: sqlite3.Connection, source_path: str):
         """,
         (source_path,),
     )
-    conn.commit()
 
 
-# TODO:
-# we can probably optimize this an run 2 queries instead of 3
-def delete_collection_by_name(conn: sqlite3.Connection, source_name: str):
+def delete_collections(conn: sqlite3.Connection, source_paths: List[str]) -> List[str]:
+    """
+    Delete several collections and their embeddings with one statement per table
+
+    Args:
+        conn: SQLite database connection
+        source_paths: Source paths of the collections to delete
+
+    Returns:
+        List[str]: Source paths of the collections that existed and were deleted
+    """
+    if not source_paths:
+        return []
+    params = (json.dumps(source_paths),)
+    conn.execute(
+        """
+        DELETE FROM embeddings WHERE collection IN (SELECT value FROM json_each(?));
+        """,
+        params,
+    )
     cursor = conn.execute(
         """
-            SELECT COUNT(*)
-            FROM collections
-            WHERE source_name = ?
-            """,
-        (source_name,),
+        DELETE FROM collections WHERE source_path IN (SELECT value FROM json_each(?)) RETURNING source_path;
+        """,
+        params,
     )
-    count = cursor.fetchone()[0]
-    if count == 0:
-        return False
+    return [row[0] for row in cursor]
+
+
+def delete_collection_by_name(conn: sqlite3.Connection, source_name: str) -> bool:
     conn.execute(
         """
         DELETE FROM embeddings WHERE collection IN (SELECT source_path FROM collections WHERE source_name = ?);
         """,
         (source_name,),
     )
-    conn.execute(
+    cursor = conn.execute(
         """
         DELETE FROM collections WHERE source_name = ?;
         """,
         (source_name,),
     )
-    conn.commit()
-    return True
+    return cursor.rowcount > 0
 
 
 def update_collection_state(conn: sqlite3.Connection, source_path: str, state: CollectionState):
@@ -385,14 +496,61 @@ def update_collection_state(conn: sqlite3.Connection, source_path: str, state: C
         """,
         (state, source_path),
     )
-    conn.commit()
 
 
 def insert_embeddings(conn: sqlite3.Connection, embeddings: List[SqliteEmbeddingRow]):
+    """Insert embedding rows that may belong to several collections.
+
+    Args:
+        conn: SQLite connection
+        embeddings: Rows to insert
+    """
+    rows_by_collection: DefaultDict[str, List[SqliteEmbeddingRow]] = defaultdict(list)
+    for embedding in embeddings:
+        rows_by_collection[embedding.collection].append(embedding)
+
+    for collection, rows in rows_by_collection.items():
+        insert_embeddings_soa(
+            conn,
+            [row.id for row in rows],
+            collection,
+            [row.text for row in rows],
+            np.stack([row.embedding for row in rows]),
+            [row.metadata for row in rows],
+        )
+
+
+def insert_embeddings_soa(
+    conn: sqlite3.Connection,
+    ids: List[str],
+    collection: str,
+    texts: List[str],
+    embeddings: np.ndarray,
+    metadatas: List[Optional[Dict[str, Any]]],
+):
+    """Insert a batch of embeddings for one collection given column by column.
+
+    Args:
+        conn: SQLite connection
+        ids: Row ids
+        collection: Collection every row belongs to
+        texts: Row texts
+        embeddings: (len(ids), dim) matrix, one embedding per row
+        metadatas: Row metadata, None is stored as an empty object
+    """
+    # One contiguous float32 matrix, each row's blob is a slice of its buffer
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
     conn.executemany(
         """
-        INSERT INTO embeddings (id, collection, text, embedding, metadata) VALUES (:id, :collection, :text, :embedding, :metadata);
+        INSERT INTO embeddings (id, collection, text, embedding, embedding_int8, metadata)
+        VALUES (?, ?, ?, ?, vec_int8(?), ?);
         """,
-        [embedding.to_row_dict() for embedding in embeddings],
+        zip(
+            ids,
+            repeat(collection),
+            texts,
+            (row.tobytes() for row in matrix),
+            (row.tobytes() for row in quantize_embeddings_int8(matrix)),
+            (json.dumps(metadata) if metadata else "{}" for metadata in metadatas),
+        ),
     )
-    conn.commit()
@@ -1,22 +1,25 @@
+import os
+import threading
 from typing import Callable, Dict, Iterator, List, Optional, Union
-from uuid import uuid4
+from uuid import UUID
 
 import numpy as np
 
 from common.log import get_logger
 from embedder.store.sqlite.sql import (
     SqliteConnInstance,
-    SqliteEmbeddingRow,
     create_collection,
     delete_collection,
     delete_collection_by_name,
+    delete_collections,
     get_collection_sources,
     get_collections_details,
     get_collections_details_by_name,
     get_embedding_row_by_id,
-    insert_embeddings,
+    insert_embeddings_soa,
     search_embeddings,
     search_relevant_collections,
+    transaction,
     update_collection_state,
 )
 from embedder.store.store import (
@@ -32,6 +35,20 @@ from embedder.store.store import (
 logger = get_logger(__name__)
 
 
+def _generate_ids(count: int) -> List[str]:
+    """
+    Generate count random (version 4) UUID strings from a single os.urandom call
+
+    Args:
+        count: Number of IDs to generate
+
+    Returns:
+        List[str]: IDs in the same format as str(uuid4())
+    """
+    raw = os.urandom(16 * count)
+    return [str(UUID(bytes=raw[i : i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
 class SqliteEmbeddingStore(EmbeddingStore):
     _name: str
 
@@ -52,20 +69,20 @@ class SqliteEmbeddingStore(EmbeddingStore):
         Returns:
             List of IDs assigned to the TextInputs
         """
-        embedding_rows: List[SqliteEmbeddingRow] = []
-        for text_input in text_inputs:
-            embedding_rows.append(
-                SqliteEmbeddingRow(
-                    id=text_input._meta.get("id", str(uuid4())),
-                    collection=self._name,
-                    text=text_input._text,
-                    embedding=text_input._vec,  # type: ignore
-                    metadata=text_input._meta,
-                )
+        existing_ids = [text_input._meta.get("id") for text_input in text_inputs]
+        new_ids = iter(_generate_ids(sum(existing_id is None for existing_id in existing_ids)))
+        ids: List[str] = [existing_id if existing_id is not None else next(new_ids) for existing_id in existing_ids]
+        with transaction(SqliteConnInstance().conn) as conn:
+            insert_embeddings_soa(
+                conn,
+                ids,
+                self._name,
+                [text_input._text for text_input in text_inputs],
+                np.stack([text_input._vec for text_input in text_inputs]),  # type: ignore
+                [text_input._meta for text_input in text_inputs],
             )
-        insert_embeddings(SqliteConnInstance().conn, embedding_rows)
-        logger.debug(f"Added {len(embedding_rows)} embeddings to {self._name}")
-        return [embedding_row.id for embedding_row in embedding_rows]
+        logger.debug(f"Added {len(ids)} embeddings to {self._name}")
+        return ids
 
     def vector_count(self) -> int:
         """Get the number of vectors in the store."""
@@ -77,14 +94,45 @@ class SqliteEmbeddingStore(EmbeddingStore):
 
 
 class SqliteDataSourceMap(DataSourceMap):
+    _sources: Optional[Dict[str, None]]
+
+    def __init__(self):
+        # Ordered set of the collection sources, loaded on first use and dropped
+        # whenever this map creates or deletes a collection
+        self._sources = None
+        self._sources_lock = threading.Lock()
+
+    def _cached_sources(self) -> Dict[str, None]:
+        """
+        Get the collection sources, querying them only if not cached
+
+        Returns:
+            Dict[str, None]: Sources in database order, as keys
+        """
+        sources = self._sources
+        if sources is None:
+            # Load under the lock so an invalidation cannot be overwritten by an older read
+            with self._sources_lock:
+                sources = self._sources
+                if sources is None:
+                    sources = dict.fromkeys(get_collection_sources(SqliteConnInstance().conn))
+                    self._sources = sources
+        return sources
+
+    def _invalidate_sources(self):
+        """
+        Drop the cached collection sources after a collection was created or deleted
+        """
+        with self._sources_lock:
+            self._sources = None
+
     def exists(self, source: str) -> bool:
         """Check if the EmbeddingStore for source exists.
 
         Args:
             source: Source location identifier for the EmbeddingStore
         """
-        conn = SqliteConnInstance().conn
-        return source in get_collection_sources(conn)
+        return source in self._cached_sources()
 
     def get(self, source: str) -> EmbeddingStore:
         """Get the EmbeddingStore for source.
@@ -95,8 +143,7 @@ class SqliteDataSourceMap(DataSourceMap):
         Returns:
             EmbeddingStore instance for the specified source
         """
-        conn = SqliteConnInstance().conn
-        if source not in get_collection_sources(conn):
+        if source not in self._cached_sources():
             raise ValueError(f"Source {source} does not exist")
         return SqliteEmbeddingStore(source)
 
@@ -115,9 +162,10 @@ class SqliteDataSourceMap(DataSourceMap):
         Returns:
             EmbeddingStore instance for the specified source
         """
-        conn = SqliteConnInstance().conn
-        if source not in get_collection_sources(conn):
-            create_collection(conn, source, source_name, source_type, status)
+        with transaction(SqliteConnInstance().conn) as conn:
+            if source not in get_collection_sources(conn):
+                create_collection(conn, source, source_name, source_type, status)
+        self._invalidate_sources()
         return SqliteEmbeddingStore(source)
 
     def delete(self, source: str) -> bool:
@@ -126,12 +174,28 @@ class SqliteDataSourceMap(DataSourceMap):
         Args:
             source: Source location identifier for the EmbeddingStore
         """
-        conn = SqliteConnInstance().conn
-        if source not in get_collection_sources(conn):
-            return False
-        delete_collection(conn, source)
+        with transaction(SqliteConnInstance().conn) as conn:
+            if source not in get_collection_sources(conn):
+                return False
+            delete_collection(conn, source)
+        self._invalidate_sources()
         return True
 
+    def delete_many(self, sources: List[str]) -> List[str]:
+        """Delete the EmbeddingStores for sources in a single transaction.
+
+        Args:
+            sources: Source location identifiers for the EmbeddingStores
+
+        Returns:
+            Sources that were found and deleted
+        """
+        with transaction(SqliteConnInstance().conn) as conn:
+            deleted = delete_collections(conn, sources)
+        if deleted:
+            self._invalidate_sources()
+        return deleted
+
     def delete_by_name(self, source_name: str) -> bool:
         """Delete the EmbeddingStore(s) for source_name.
 
@@ -141,13 +205,15 @@ class SqliteDataSourceMap(DataSourceMap):
         Returns:
             True if at least one EmbeddingStore was deleted, False if none were found
         """
-        conn = SqliteConnInstance().conn
-        return delete_collection_by_name(conn, source_name)
+        with transaction(SqliteConnInstance().conn) as conn:
+            deleted = delete_collection_by_name(conn, source_name)
+        self._invalidate_sources()
+        return deleted
 
     def set_state(self, source: str, state: CollectionState):
         """Set the state of the collection."""
-        conn = SqliteConnInstance().conn
-        update_collection_state(conn, source, state)
+        with transaction(SqliteConnInstance().conn) as conn:
+            update_collection_state(conn, source, state)
 
     def get_text_input_by_id(self, id: Union[str, int], source: str) -> Optional[TextInput]:
         """Get the TextInput for the specified ID from the specified source.
@@ -174,8 +240,7 @@ class SqliteDataSourceMap(DataSourceMap):
         Returns:
             List of source identifiers
         """
-        conn = SqliteConnInstance().conn
-        return get_collection_sources(conn)
+        return list(self._cached_sources())
 
     def get_sources_stats(self) -> Dict[str, DataSourceStats]:
         """Get statistics for all sources.
@@ -220,9 +285,8 @@ class SqliteDataSourceMap(DataSourceMap):
         Returns:
             List of source identifiers
         """
-        conn = SqliteConnInstance().conn
         embedding_stores: List[EmbeddingStore] = []
-        for collection in get_collection_sources(conn):
+        for collection in self._cached_sources():
             embedding_stores.append(SqliteEmbeddingStore(collection))
         return embedding_stores
 
@@ -283,14 +347,12 @@ class SqliteDataSourceMap(DataSourceMap):
 
     def __len__(self) -> int:
         """Return the number of data sources."""
-        return len(list(self.__iter__()))
+        return len(self._cached_sources())
 
     def __contains__(self, source: str) -> bool:
         """Check if a data source exists."""
-        return source in self.__iter__()
+        return source in self._cached_sources()
 
     def __iter__(self) -> Iterator[str]:
         """Iterate over source names."""
-        conn = SqliteConnInstance().conn
-        for collection in get_collection_sources(conn):
-            yield collection
+        yield from self._cached_sources()
@@ -1,5 +1,5 @@
 import abc
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Callable, Dict, Iterator, List, Optional
 
@@ -94,7 +94,13 @@ class DataSourceStats:
     dimension: int
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "source_name": self.source_name,
+            "source_path": self.source_path,
+            "status": self.status,
+            "vector_count": self.vector_count,
+            "dimension": self.dimension,
+        }
 
 
 class EmbeddingStore(abc.ABC):
@@ -167,6 +173,18 @@ class DataSourceMap(abc.ABC):
         """
         pass
 
+    @abc.abstractmethod
+    def delete_many(self, sources: List[str]) -> List[str]:
+        """Delete the EmbeddingStores for several sources at once.
+
+        Args:
+            sources: Source location identifiers for the EmbeddingStores
+
+        Returns:
+            Sources that were found and deleted
+        """
+        pass
+
     @abc.abstractmethod
     def delete_by_name(self, source_name: str) -> bool:
         """Delete the EmbeddingStore(s) for source_name.
@@ -64,6 +64,9 @@ class TextBatch:
             vecs (np.ndarray): vector embeddings for the values
                 (output of the vectorizer)
         """
+        # One contiguous float32 matrix, every input gets a row view into it rather
+        # than its own array, and stores can encode rows without converting them
+        vecs = np.ascontiguousarray(vecs, dtype=np.float32)
         for input, vec in zip(self.inputs, vecs):
             input._vec = vec
 
@@ -3,10 +3,25 @@ from typing import Optional
 import numpy as np
 import torch
 
-from common.device import best_device
 from embedder.text import TextBatch
 from embedder.vectorizer.interface import Vectorizer
 
+MOCK_VECTOR_SIZE = 10
+
+
+def mock_vector(text_length: int) -> np.ndarray:
+    """
+    Deterministic unit vector for a text length, like the real model's normalized output
+
+    Args:
+        text_length: Length of the vectorized text
+
+    Returns:
+        np.ndarray: float32 unit vector of MOCK_VECTOR_SIZE components
+    """
+    vector = np.random.default_rng(text_length).standard_normal(MOCK_VECTOR_SIZE)
+    return (vector / np.linalg.norm(vector)).astype(np.float32)
+
 
 class MockVectorizer(Vectorizer):
     __slots__ = "_device"
@@ -17,10 +32,9 @@ class MockVectorizer(Vectorizer):
         Initialize mock vectorizer for testing
 
         Args:
-            device: Torch device to use (default: best available)
+            device: Torch device to use (default: cpu, mock vectors are built with numpy)
         """
-        if device is None:
-            device = best_device()
+        self._device = device if device is not None else torch.device("cpu")
 
     def vectorize(self, batch: TextBatch):
         """
@@ -29,4 +43,4 @@ class MockVectorizer(Vectorizer):
         Args:
             batch: TextBatch to vectorize
         """
-        batch.set_vectors(np.array([np.array([len(ti._text)] * 10) for ti in batch.inputs]))
+        batch.set_vectors(np.stack([mock_vector(len(ti._text)) for ti in batch.inputs]))
@@ -1,6 +1,7 @@
 from typing import Optional
 
 import mlx.core as mx
+import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer
 
@@ -45,6 +46,10 @@ class SentenceTransformerVectorizer(Vectorizer):
                 tokenizer_kwargs={"use_fast": True, "clean_up_tokenization_spaces": True},
             )
             self._model.eval()  # make sure we're in inference mode, not training
+            if self._device.type in ("cuda", "mps"):
+                # Half precision halves activation memory traffic on GPUs, embeddings
+                # are still returned as float32 by vectorize
+                self._model.half()
 
     def free(self):
         """
@@ -66,5 +71,14 @@ class SentenceTransformerVectorizer(Vectorizer):
             batch: TextBatch to vectorize
         """
         self._load_model()
-        embeddings = self._model.encode(batch.to_text_array(), batch_size=min(1000, len(batch)), device=self._device)  # type: ignore
-        batch.set_vectors(embeddings)
+        # Unit vectors make L2 ranking equivalent to cosine/dot product ranking and keep
+        # every component in [-1, 1], the range the stored int8 copy is quantized for
+        with torch.inference_mode():
+            embeddings = self._model.encode(  # type: ignore
+                batch.to_text_array(),
+                batch_size=min(1000, len(batch)),
+                device=self._device,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+        batch.set_vectors(embeddings.astype(np.float32, copy=False))
@@ -1,6 +1,6 @@
 import json
 from datetime import timedelta
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Tuple
 
 from common.config.constant import Constant
 from embedder.constants import (
@@ -72,92 +72,116 @@ frozen_config_map: Dict[str, Constant[Any]] = {
 }
 
 
-def validate_config_type(constant: Constant[Any], value: Any) -> Any:
-    error = MCPError(
-        f"Invalid config value or type: for constant of type [{constant.default_type}] and value [{value}]"
-    )
+def _check_uppercase_names(config_map: Dict[str, Any], kind: str) -> None:
+    # Checked at import rather than asserted so it still runs under python -O
+    lowercase = [name for name in config_map if not name.isupper()]
+    if lowercase:
+        raise ValueError(f"{kind} config names must be uppercase: {', '.join(lowercase)}")
+
+
+# Config names are uppercase by construction, so lookups only need to normalize the incoming name
+_check_uppercase_names(editable_name_to_config_map, "editable")
+_check_uppercase_names(frozen_config_map, "frozen")
+
+
+def _str_to_timedelta(value: str) -> timedelta:
+    # Whole seconds are the common case and int() parses faster than float()
     try:
-        # Direct type match - return as is
-        if constant.default_type == type(value):
-            return value
-
-        # Type conversions
-        if constant.default_type == str:
-            return str(value)
-
-        elif constant.default_type == int:
-            if isinstance(value, str):
-                return int(value)
-            elif isinstance(value, float):
-                return int(value)
-            elif isinstance(value, int):
-                return value
-            return int(value)
-
-        elif constant.default_type == float:
-            if isinstance(value, str):
-                return float(value)
-            elif isinstance(value, (int, float)):
-                return float(value)
-            return float(value)
-
-        elif constant.default_type == bool:
-            if isinstance(value, bool):
-                return value
-            if isinstance(value, str):
-                return value.lower() in ("true", "1", "yes", "on")
-            if isinstance(value, (int, float)):
-                return bool(value)
-            return bool(value)
-
-        elif constant.default_type == timedelta:
-            if isinstance(value, timedelta):
-                return value
-            if isinstance(value, (int, float)):
-                return timedelta(seconds=value)
-            if isinstance(value, str):
-                return timedelta(seconds=float(value))
-            return timedelta(seconds=float(value))
-
-        elif constant.default_type == list:
-            if isinstance(value, list):
-                return value
-            if isinstance(value, str):
-                if not value.strip():
-                    return []
-                # Handle comma-separated values
-                return [item.strip() for item in value.split(",")]
-            return list(value)
-
-        elif constant.default_type == dict:
-            if isinstance(value, dict):
-                return value
-            if isinstance(value, str):
-                return json.loads(value)
-            return dict(value)
-    except Exception:
-        raise error
-
-    raise error
+        return timedelta(seconds=int(value))
+    except ValueError:
+        return timedelta(seconds=float(value))
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes", "on")
+    return bool(value)
+
+
+def _to_timedelta(value: Any) -> timedelta:
+    if isinstance(value, (int, float)):
+        return timedelta(seconds=value)
+    if isinstance(value, str):
+        return _str_to_timedelta(value)
+    return timedelta(seconds=float(value))
+
+
+def _to_list(value: Any) -> list:
+    if isinstance(value, str):
+        if not value or value.isspace():
+            return []
+        # Handle comma-separated values
+        return [item.strip() for item in value.split(",")]
+    return list(value)
+
+
+def _to_dict(value: Any) -> dict:
+    if isinstance(value, str):
+        return json.loads(value)
+    return dict(value)
+
+
+# Converters for a value whose type differs from the constant's, keyed by the type of the default value
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    str: str,
+    int: int,
+    float: float,
+    bool: _to_bool,
+    timedelta: _to_timedelta,
+    list: _to_list,
+    dict: _to_dict,
+}
+
+
+def validate_config_type(constant: Constant[Any], value: Any) -> Any:
+    default_type = constant.default_type
+    # Direct type match - return as is
+    if type(value) is default_type:
+        return value
+
+    converter = _CONVERTERS.get(default_type)
+    if converter is not None:
+        try:
+            return converter(value)
+        except Exception:
+            pass
+
+    raise MCPError(f"Invalid config value or type: for constant of type [{default_type}] and value [{value}]")
 
 
 def format_config(value: Any, is_frozen: bool = False) -> Dict[str, Any]:
     return {"value": value, "type": type(value).__name__, "frozen": is_frozen}
 
 
+# Formatted entries keyed by (name, frozen), reused while the constant still holds the same value object.
+# Checking identity rather than hooking edit_config also catches values set directly through Constant.set.
+_formatted_config_cache: Dict[Tuple[str, bool], Tuple[Any, Dict[str, Any]]] = {}
+
+
+def _cached_format_config(name: str, constant: Constant[Any], is_frozen: bool) -> Dict[str, Any]:
+    value = constant.value
+    cached = _formatted_config_cache.get((name, is_frozen))
+    if cached is not None and cached[0] is value:
+        return cached[1]
+    formatted = format_config(value, is_frozen=is_frozen)
+    _formatted_config_cache[(name, is_frozen)] = (value, formatted)
+    return formatted
+
+
 def edit_config(name: str, value: Any) -> Dict[str, Any]:
-    if name.upper() not in editable_name_to_config_map:
+    key = name if name.isupper() else name.upper()
+    constant = editable_name_to_config_map.get(key)
+    if constant is None:
         raise MCPError(f"Invalid config name: {name}")
-    constant = editable_name_to_config_map[name.upper()]
     validated_value = validate_config_type(constant, value)
     constant.set(validated_value)
-    return {name.upper(): format_config(validated_value)}
+    return {key: format_config(validated_value)}
 
 
 def all_configs() -> Dict[str, Any]:
     data = {}
     for name, constant in editable_name_to_config_map.items():
-        data[name.upper()] = format_config(constant.value)
+        data[name] = _cached_format_config(name, constant, False)
     for name, constant in frozen_config_map.items():
-        data[name.upper()] = format_config(constant.value, is_frozen=True)
+        data[name] = _cached_format_config(name, constant, True)
     return data
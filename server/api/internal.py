@@ -3,7 +3,12 @@ from typing import Any, Dict, List, Optional
 
 from common.log import get_logger
 from embedder.store.store import USER_QUERY_SOURCE, CollectionState
-from server.api.search import SearchResult, most_relevant_sources, search
+from server.api.search import (
+    SearchResult,
+    evict_file_content,
+    most_relevant_sources,
+    search,
+)
 from server.constants import (
     DEEP_SEARCH_RESULT_LIMIT,
     MAX_SOURCES_IN_DEEP_SEARCH,
@@ -24,6 +29,12 @@ from server.workers.ingestion_state_manager import IngestionPhase
 
 logger = get_logger(__name__)
 
+# The healthy system status never changes, it is shared between calls and must not be mutated
+_OPERATIONAL_SYSTEM_STATUS: Dict[str, Any] = {
+    "status": "success",
+    "system_health": "operational",
+}
+
 
 def _process_file_async(file_paths: List[str], source_name: Optional[str] = None):
     """
@@ -36,16 +47,20 @@ def _process_file_async(file_paths: List[str], source_name: Optional[str] = None
     transcription_queue = get_transcription_queue()
     embedder_read_queue = get_embedder_read_queue()
     data_source_map = get_data_source_map()
+    progress_manager = get_ingestion_state_manager()
 
-    for file_path in file_paths:
-        if data_source_map.exists(file_path):
-            logger.debug(f"Data source {file_path} already exists, deleting it prior to ingestion")
-            _delete_data_source(file_path)
+    # Clear out sources that are being re-ingested in one transaction rather than one per file
+    existing_file_paths = [file_path for file_path in file_paths if data_source_map.exists(file_path)]
+    if existing_file_paths:
+        logger.debug(f"Data sources {existing_file_paths} already exist, deleting them prior to ingestion")
+        data_source_map.delete_many(existing_file_paths)
+        for file_path in existing_file_paths:
+            evict_file_content(file_path)
 
+    for file_path in file_paths:
         try:
             reader = ReaderFactory.create_reader(file_path)
             # Set ingestion initial state
-            progress_manager = get_ingestion_state_manager()
             progress_manager.create_state(
                 file_path,
                 data_source_map.success_ingestion_process_callback(file_path),
@@ -105,12 +120,8 @@ def _active_data_sources() -> Optional[List[str]]:
         Optional[List[str]]: List of active data source names or None if empty
     """
     with ActiveDataSources() as c:
-        sources = (
-            list(c.active_data_sources.copy())
-            if c.active_data_sources is not None and len(c.active_data_sources) > 0
-            else None
-        )
-        return sources
+        # list() already snapshots the set under the lock, no need for an intermediate copy
+        return list(c.active_data_sources) if c.active_data_sources else None
 
 
 def _post_process_search_results(query: str, search_results: List[SearchResult], search_time: float) -> Dict[str, Any]:
@@ -125,16 +136,10 @@ def _post_process_search_results(query: str, search_results: List[SearchResult],
     Returns:
         Dict[str, Any]: Formatted response with status, query, results count, time, and results
     """
-    # Format results for better readability
-    formatted_results = []
-    for result in search_results:
-        formatted_results.append(
-            {
-                "text": result.text,
-                "source": result.source,
-                "distance": float(result.distance),
-            }
-        )
+    # Format results for better readability, distances already come back from sqlite as python floats
+    formatted_results = [
+        {"text": result.text, "source": result.source, "distance": result.distance} for result in search_results
+    ]
 
     return {
         "status": "success",
@@ -159,15 +164,14 @@ def _search_files(query: str, offset: int = 0) -> Dict[str, Any]:
     embedder_read_queue = get_embedder_read_queue()
     data_source_map = get_data_source_map()
 
-    if not query.strip():
+    if not query or query.isspace():
         return {"status": "error", "error": "Query cannot be empty"}
 
     sources = _active_data_sources()
 
-    start_time = time.time()
+    start_time = time.perf_counter()
     search_results = search(query, embedder_read_queue, data_source_map, sources, SEARCH_RESULT_LIMIT.value, offset)
-    search_time = time.time() - start_time
-    search_results = search_results[offset : offset + SEARCH_RESULT_LIMIT.value]
+    search_time = time.perf_counter() - start_time
 
     return _post_process_search_results(query, search_results, search_time)
 
@@ -186,7 +190,7 @@ def _deep_search(query: str, sources: List[str]) -> Dict[str, Any]:
     embedder_read_queue = get_embedder_read_queue()
     data_source_map = get_data_source_map()
 
-    if not query.strip():
+    if not query or query.isspace():
         return {"status": "error", "error": "Query cannot be empty"}
 
     if len(sources) > MAX_SOURCES_IN_DEEP_SEARCH.value:
@@ -195,7 +199,7 @@ def _deep_search(query: str, sources: List[str]) -> Dict[str, Any]:
             "error": f"Too many sources: {len(sources)} (max = {MAX_SOURCES_IN_DEEP_SEARCH.value})",
         }
 
-    start_time = time.time()
+    start_time = time.perf_counter()
     search_results = search(
         query,
         embedder_read_queue,
@@ -203,8 +207,7 @@ def _deep_search(query: str, sources: List[str]) -> Dict[str, Any]:
         sources,
         DEEP_SEARCH_RESULT_LIMIT.value,
     )
-    search_time = time.time() - start_time
-    search_results = search_results[: DEEP_SEARCH_RESULT_LIMIT.value]
+    search_time = time.perf_counter() - start_time
 
     return _post_process_search_results(query, search_results, search_time)
 
@@ -223,11 +226,11 @@ def _most_relevant_files(query: str) -> Dict[str, Any]:
     data_source_map = get_data_source_map()
 
     sources = _active_data_sources()
-    start_time = time.time()
+    start_time = time.perf_counter()
     most_relevant_sources_list = most_relevant_sources(
         query, embedder_read_queue, data_source_map, sources, SEARCH_RESULT_LIMIT.value
     )
-    search_time = time.time() - start_time
+    search_time = time.perf_counter() - start_time
     return {
         "status": "success",
         "most_relevant_sources": most_relevant_sources_list,
@@ -319,10 +322,7 @@ def _get_system_status() -> Dict[str, Any]:
         Dict[str, Any]: System status and health information
     """
     check_dependencies()
-    return {
-        "status": "success",
-        "system_health": "operational",
-    }
+    return _OPERATIONAL_SYSTEM_STATUS
 
 
 def _delete_data_source(source: str) -> Dict[str, Any]:
@@ -337,6 +337,7 @@ def _delete_data_source(source: str) -> Dict[str, Any]:
     """
     data_source_map = get_data_source_map()
     found = data_source_map.delete(source)
+    evict_file_content(source)
     return {
         "status": "success",
         "message": f"Data source {source} deleted successfully" if found else f"Data source {source} not found",
@@ -28,7 +28,6 @@ from server.thread_managers.transcription_manager import (
     TranscriptionThreadManager,
 )
 from server.workers.ingestion_state_manager import SourceIngestionProgressManager
-from transcriber import ParakeetProvider
 
 logger = get_logger(__name__)
 
@@ -57,6 +56,9 @@ def initialize_dependencies(
     global_embedder_manager.set(embedder_manager)
     global_data_source_map.set(data_source_map)
     global_ingestion_state_manager.set(ingestion_state_manager)
+    # Imported here so the MCP app can be imported without loading the transcription model runtime
+    from transcriber import ParakeetProvider
+
     # Initialize transcription infrastructure
     transcription_queue = BulkQueue[TranscriptionTask](maxsize=1000)
     transcription_manager = TranscriptionThreadManager(
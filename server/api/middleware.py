@@ -1,7 +1,6 @@
 import traceback
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from common.log import get_logger
 from server.error import MCPError
@@ -9,22 +8,44 @@ from server.error import MCPError
 logger = get_logger(__name__)
 
 
-class MCPErrorMiddleware(BaseHTTPMiddleware):
+class MCPErrorMiddleware:
     """Middleware to catch and handle MCPError exceptions in custom routes only.
     This does not apply to tool calls.
     By convention, all custom routes should be prefixed with "/manual/".
+
+    Implemented as plain ASGI rather than BaseHTTPMiddleware so requests are not
+    routed through an extra task and memory stream, and streamed responses pass through untouched.
     """
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            response = await call_next(request)
-            return response
+            await self.app(scope, receive, send_wrapper)
         except MCPError as e:
             if e.code == 500:
                 logger.error(f"Internal server error: {e.error_message}")
                 logger.error(f"Full traceback: {traceback.format_exc()}")
-            return e.as_starlette_response()
+            # Headers already went out, there is no way to replace the response anymore
+            if response_started:
+                raise
+            await e.as_starlette_response()(scope, receive, send)
         except Exception as e:
             logger.error(f"Internal server error: {e}")
             logger.error(f"Full traceback: {traceback.format_exc()}")
-            return MCPError("Unexpected error server error", 500).as_starlette_response()
+            if response_started:
+                raise
+            await MCPError("Unexpected error server error", 500).as_starlette_response()(scope, receive, send)
@@ -0,0 +1,20 @@
+from typing import Any
+
+import orjson
+from starlette.requests import Request
+
+
+async def read_json(request: Request) -> Any:
+    """
+    Parse the JSON body of a request
+
+    Args:
+        request: HTTP request with a JSON body
+
+    Returns:
+        Any: The decoded body
+
+    Raises:
+        json.JSONDecodeError: If the body is not valid JSON (orjson.JSONDecodeError subclasses it)
+    """
+    return orjson.loads(await request.body())
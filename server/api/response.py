@@ -1,13 +1,22 @@
-import json
 from datetime import datetime, timedelta
-from typing import Any, Mapping
+from typing import Any, Callable, Dict, Mapping
 
+import orjson
 from starlette.background import BackgroundTask
 from starlette.responses import Response
 
+# Serializers keyed by exact type, subclasses go through the isinstance fallback in json_serializer.
+# orjson encodes exact datetimes itself and only calls json_serializer for their subclasses
+_SERIALIZERS: Dict[type, Callable[[Any], Any]] = {
+    timedelta: timedelta.total_seconds,
+}
+
 
 def json_serializer(obj: Any) -> Any:
-    """Custom JSON serializer for datetime objects."""
+    """Custom JSON serializer for the types orjson does not encode natively (timedeltas, datetime subclasses)."""
+    serializer = _SERIALIZERS.get(type(obj))
+    if serializer is not None:
+        return serializer(obj)
     if isinstance(obj, datetime):
         return obj.isoformat()
     elif isinstance(obj, timedelta):
@@ -29,11 +38,8 @@ class JSONResponse(Response):
         super().__init__(content, status_code, headers, media_type, background)
 
     def render(self, content: Any) -> bytes:
-        return json.dumps(
-            content,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-            default=json_serializer,
-        ).encode("utf-8")
+        # orjson encodes datetimes and numpy values natively, json_serializer only sees timedeltas
+        # and datetime subclasses; output is already utf-8 bytes
+        return orjson.dumps(
+            content, default=json_serializer, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
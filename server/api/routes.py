@@ -1,6 +1,8 @@
 import asyncio
 import os
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterator, List, Set
 
 from starlette.requests import Request
 from starlette.routing import Route
@@ -21,6 +23,7 @@ from server.api.internal import (
     _process_url,
     _search_files,
 )
+from server.api.request import read_json
 from server.api.response import JSONResponse
 from server.constants import INGESTION_PROCESS_MAX_FILE_PATHS
 from server.error import MCPError
@@ -28,26 +31,73 @@ from server.shared import ActiveDataSources
 
 logger = get_logger(__name__)
 
+# Blocking handlers (waiting on the embedder, downloads, sqlite) run here so they never stall the event loop
+_API_EXECUTOR = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4), thread_name_prefix="mcp-api")
+# Fire-and-forget ingestion futures, referenced until they finish so they are not garbage collected
+_background_futures: Set[asyncio.Future] = set()
 
-def expand_file_path(file_path: str) -> List[str]:
+
+async def _run_blocking(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a blocking function on the API executor without blocking the event loop
+
+    Args:
+        func: Blocking function to run
+        *args: Positional arguments for func
+
+    Returns:
+        Any: The return value of func
+    """
+    return await asyncio.get_running_loop().run_in_executor(_API_EXECUTOR, func, *args)
+
+
+def _walk_files(directory: str) -> Iterator[str]:
+    """Lazily yield every file below a directory, the same files os.walk would report.
+
+    Symlinked directories are not followed and unreadable subdirectories are skipped.
+
+    Args:
+        directory: Directory to walk
+
+    Yields:
+        str: Path of each file found
+    """
+    pending = [directory]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif not entry.is_dir():
+                        yield entry.path
+        except OSError:
+            continue
+
+
+def expand_file_path(file_path: str, limit: int) -> List[str]:
     """Expand a file path to a list of all files.
 
     If file_path is a single file, return [file_path].
-    If it's a directory, recursively find all files in the directory and subdirectories.
+    If it's a directory, recursively find all files in the directory and subdirectories,
+    stopping as soon as more than limit files are found.
 
     Args:
         file_path: Path to a file or directory
+        limit: Maximum number of files allowed
 
     Returns:
         List of file paths
+
+    Raises:
+        MCPError: If the path does not exist or holds more than limit files
     """
     if os.path.isfile(file_path):
         return [file_path]
     elif os.path.isdir(file_path):
-        file_paths = []
-        for root, dirs, files in os.walk(file_path):
-            for file in files:
-                file_paths.append(os.path.join(root, file))
+        file_paths = list(islice(_walk_files(file_path), limit + 1))
+        if len(file_paths) > limit:
+            raise MCPError(f"Too many files in path {file_path} (max = {limit})", code=400)
         return file_paths
     else:
         raise MCPError(f"Invalid file path: {file_path}", code=400)
@@ -63,15 +113,13 @@ async def process_file_async_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Success status with 201 status code
     """
-    data = await request.json()
+    data = await read_json(request)
     file_path = data["file_path"]
-    file_paths = expand_file_path(file_path)
-    if len(file_paths) > INGESTION_PROCESS_MAX_FILE_PATHS.value:
-        raise MCPError(
-            f"Too many files: {len(file_paths)} in path {file_path} (max = {INGESTION_PROCESS_MAX_FILE_PATHS.value})",
-            code=400,
-        )
-    asyncio.get_event_loop().run_in_executor(None, _process_file_async, file_paths, data.get("source_name"))
+    file_paths = expand_file_path(file_path, INGESTION_PROCESS_MAX_FILE_PATHS.value)
+    # Ingestion can take minutes, keep it on the default executor so it does not hold API workers
+    future = asyncio.get_running_loop().run_in_executor(None, _process_file_async, file_paths, data.get("source_name"))
+    _background_futures.add(future)
+    future.add_done_callback(_background_futures.discard)
     return JSONResponse({"status": "success"}, status_code=201)
 
 
@@ -85,11 +133,11 @@ async def process_url_async_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Success status with confirmation message
     """
-    data = await request.json()
+    data = await read_json(request)
     url = data.get("url")
     if not url:
         raise MCPError("url is required", code=400)
-    _process_url(url, data.get("source_name"))
+    await _run_blocking(_process_url, url, data.get("source_name"))
     return JSONResponse({"status": "success", "message": f"URL {url} added to download queue"}, status_code=201)
 
 
@@ -103,10 +151,10 @@ async def search_file_manual_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Search results with matching text snippets
     """
-    data = await request.json()
+    data = await read_json(request)
     query = data["query"]
     offset = data.get("offset", 0)
-    return JSONResponse(_search_files(query, offset))
+    return JSONResponse(await _run_blocking(_search_files, query, offset))
 
 
 async def deep_search_api(request: Request) -> JSONResponse:
@@ -119,10 +167,10 @@ async def deep_search_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Extended search results from specified sources
     """
-    data = await request.json()
+    data = await read_json(request)
     query = data["query"]
     sources = data["sources"]
-    return JSONResponse(_deep_search(query, sources))
+    return JSONResponse(await _run_blocking(_deep_search, query, sources))
 
 
 async def most_relevant_files_api(request: Request) -> JSONResponse:
@@ -135,9 +183,9 @@ async def most_relevant_files_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: List of files ranked by relevance
     """
-    data = await request.json()
+    data = await read_json(request)
     query = data["query"]
-    return JSONResponse(_most_relevant_files(query))
+    return JSONResponse(await _run_blocking(_most_relevant_files, query))
 
 
 async def get_system_status_api(_: Request) -> JSONResponse:
@@ -175,7 +223,7 @@ async def set_config_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Updated configuration data
     """
-    data = await request.json()
+    data = await read_json(request)
     config_name = data["config_name"]
     config_value = data["config_value"]
     c = edit_config(config_name, config_value)
@@ -227,7 +275,7 @@ async def get_ingestion_status_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Ingestion status and progress information
     """
-    data = await request.json()
+    data = await read_json(request)
     source = data["source"]
     return JSONResponse(_get_collection_ingestion_status(source))
 
@@ -242,7 +290,7 @@ async def delete_data_source_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Deletion confirmation status
     """
-    data = await request.json()
+    data = await read_json(request)
     source = data["source"]
     return JSONResponse(_delete_data_source(source))
 
@@ -257,7 +305,7 @@ async def delete_data_sources_by_name_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Deletion confirmation status
     """
-    data = await request.json()
+    data = await read_json(request)
     source_name = data["source_name"]
     return JSONResponse(_delete_data_sources_by_name(source_name))
 
@@ -274,19 +322,16 @@ async def mark_data_sources_as_active_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Updated list of active data sources
     """
-    data = await request.json()
+    data = await read_json(request)
     source_paths = data["source_paths"]
 
+    # Validation reads the store, do it before taking the lock so other requests are not held up
+    validated_source_paths = ActiveDataSources().validate_data_sources(source_paths)
     with ActiveDataSources() as c:
-        if c.active_data_sources is None:
-            c.active_data_sources = set()
-        validated_source_paths = c.validate_data_sources(source_paths)
-        for source_path in validated_source_paths:
-            if source_path in c.active_data_sources:
-                continue
-            c.active_data_sources.add(source_path)
+        c.active_data_sources = (c.active_data_sources or set()).union(validated_source_paths)
+        active_data_sources = list(c.active_data_sources)
 
-    return JSONResponse({"status": "ok", "active_data_sources": list(c.active_data_sources)})
+    return JSONResponse({"status": "ok", "active_data_sources": active_data_sources})
 
 
 async def mark_data_sources_as_inactive_api(request: Request) -> JSONResponse:
@@ -299,18 +344,14 @@ async def mark_data_sources_as_inactive_api(request: Request) -> JSONResponse:
     Returns:
         JSONResponse: Updated list of active data sources
     """
-    data = await request.json()
+    data = await read_json(request)
     source_paths = data.get("source_paths")
     if source_paths is None:
         raise MCPError("source_paths is required", code=400)
     with ActiveDataSources() as c:
-        if c.active_data_sources is None:
-            c.active_data_sources = set()
-        for source_path in source_paths:
-            if source_path not in c.active_data_sources:
-                continue
-            c.active_data_sources.remove(source_path)
-    return JSONResponse({"status": "ok", "active_data_sources": list(c.active_data_sources)})
+        c.active_data_sources = (c.active_data_sources or set()).difference(source_paths)
+        active_data_sources = list(c.active_data_sources)
+    return JSONResponse({"status": "ok", "active_data_sources": active_data_sources})
 
 
 async def get_active_data_sources_api(_: Request) -> JSONResponse:
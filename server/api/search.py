@@ -1,7 +1,24 @@
+import heapq
+import os
+import re
+import threading
 import time
-from collections import defaultdict
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, DefaultDict, Dict, List, Optional, Tuple
+from operator import attrgetter
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 from uuid import uuid4
 
 import numpy as np
@@ -16,6 +33,8 @@ from embedder.store.store import (
 )
 from embedder.text import TextInput
 from server.constants import (
+    FILE_CONTENT_CACHE_SIZE,
+    QUERY_VECTORS_CACHE_SIZE,
     SEARCH_CHUNK_CHARACTER_LIMIT,
     SEARCH_CHUNKS_LIMIT,
     SEARCH_CONTEXT_EXTENSION_CHARACTERS,
@@ -27,8 +46,22 @@ from server.read.reader import SourceType, TextChunk
 
 logger = get_logger(__name__)
 
-# Cache for file contents to avoid re-reading the same file multiple times
-_file_content_cache: Dict[str, str] = {}
+# Cache for file contents to avoid re-reading the same file multiple times,
+# least recently used first and bounded so a large corpus cannot pile up in memory
+_file_content_cache: "OrderedDict[str, str]" = OrderedDict()
+_file_content_cache_lock = threading.Lock()
+
+# Embeddings of recent queries, least recently used first, so repeated queries skip the embedder roundtrip
+_query_vectors_cache: "OrderedDict[str, List[np.ndarray]]" = OrderedDict()
+_query_vectors_cache_lock = threading.Lock()
+
+# Searches for the lines of a multi-line query run concurrently: sqlite releases the GIL
+# while it scans and every thread gets its own connection
+_query_search_executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="query-search")
+
+# Set by the storage thread once the embeddings of a user query are stored, keyed by query id
+_query_stored_events: Dict[str, threading.Event] = {}
+_query_stored_events_lock = threading.Lock()
 
 
 @dataclass
@@ -41,6 +74,7 @@ class SearchResult:
         source_type: The type of source (LOCAL_TEXT_FILE or USER_QUERY)
         start_index: The starting character index in the source
         end_index: The ending character index in the source
+        distance: Distance between the query and the matched content, as a python float
     """
 
     text: str
@@ -51,7 +85,6 @@ class SearchResult:
     distance: float
 
 
-# TODO: Add testing for this function
 def _get_extended_search_result_indices(
     text_inputs: List[TextInputWithDistance],
 ) -> List[Tuple[int, int, float]]:
@@ -64,18 +97,31 @@ def _get_extended_search_result_indices(
         text_inputs: List of TextInput objects with metadata
 
     Returns:
-        List of tuples containing the merged extended start and end indices
+        List of (start, end, distance) tuples for the merged windows, where distance is the
+        smallest distance among the text inputs merged into the window
     """
     if not text_inputs:
         return []
 
+    extension = SEARCH_CONTEXT_EXTENSION_CHARACTERS.value
+    if len(text_inputs) == 1:
+        # Most sources match a single chunk, there is nothing to sort or merge
+        text_input = text_inputs[0]
+        return [
+            (
+                max(0, text_input._meta["start_index"] - extension),
+                text_input._meta["end_index"] + extension,
+                text_input._distance,
+            )
+        ]
+
     # TODO:
     # handle non-symetric character expansion
     # to account for when we are close to the start or end of the text
     extended_indices = [
         (
-            max(0, text_input._meta["start_index"] - SEARCH_CONTEXT_EXTENSION_CHARACTERS.value),
-            text_input._meta["end_index"] + SEARCH_CONTEXT_EXTENSION_CHARACTERS.value,
+            max(0, text_input._meta["start_index"] - extension),
+            text_input._meta["end_index"] + extension,
             text_input._distance,
         )
         for text_input in text_inputs
@@ -86,15 +132,19 @@ def _get_extended_search_result_indices(
 
     # Merge overlapping windows
     merged_indices = []
-    current_start, current_end, current_distance = extended_indices[0]
+    windows = iter(extended_indices)
+    current_start, current_end, current_distance = next(windows)
 
-    for start, end, distance in extended_indices[1:]:
+    for start, end, distance in windows:
         if start <= current_end:
-            # Windows overlap, extend the current window
-            current_end = max(current_end, end, min(current_distance, distance))
+            # Windows overlap, extend the current window and keep its best distance
+            if end > current_end:
+                current_end = end
+            if distance < current_distance:
+                current_distance = distance
         else:
             # No overlap, save current window and start a new one
-            merged_indices.append((current_start, current_end, distance))
+            merged_indices.append((current_start, current_end, current_distance))
             current_start, current_end, current_distance = start, end, distance
 
     # Add the final window
@@ -103,6 +153,10 @@ def _get_extended_search_result_indices(
     return merged_indices
 
 
+# Source types whose reader supports reading a window without decoding the whole document
+_RANGE_READ_SOURCE_TYPES = frozenset({SourceType.LOCAL_TEXT_FILE})
+
+
 def _get_cached_file_content(file_path: str, file_source_type: SourceType) -> Optional[str]:
     """
     Get file content from cache or read and cache it
@@ -114,12 +168,34 @@ def _get_cached_file_content(file_path: str, file_source_type: SourceType) -> Op
     Returns:
         Optional[str]: File content as string, or None if file cannot be read
     """
-    if file_path in _file_content_cache:
-        return _file_content_cache[file_path]
+    with _file_content_cache_lock:
+        content = _file_content_cache.get(file_path)
+        if content is not None:
+            _file_content_cache.move_to_end(file_path)
+            return content
 
     reader = ReaderFactory.create_reader(file_path)
-    _file_content_cache[file_path] = reader.read()
-    return _file_content_cache[file_path]
+    content = reader.read()
+
+    cache_size = FILE_CONTENT_CACHE_SIZE.value
+    if cache_size > 0:
+        with _file_content_cache_lock:
+            _file_content_cache[file_path] = content
+            _file_content_cache.move_to_end(file_path)
+            while len(_file_content_cache) > cache_size:
+                _file_content_cache.popitem(last=False)
+    return content
+
+
+def evict_file_content(file_path: str):
+    """
+    Drop a file from the content cache so stale content is not served after it changes
+
+    Args:
+        file_path: Path of the file to drop
+    """
+    with _file_content_cache_lock:
+        _file_content_cache.pop(file_path, None)
 
 
 def _read_extended_file_content(
@@ -129,9 +205,10 @@ def _read_extended_file_content(
     source: str,
     file_source_type: SourceType,
     distance: float,
+    anchor: Optional[Tuple[int, int]] = None,
 ) -> Optional[SearchResult]:
     """
-    Read extended file content from specified indices with caching
+    Read extended file content from specified indices, caching documents that cannot be read by range
 
     Args:
         start_index: Starting character index to read from
@@ -140,38 +217,40 @@ def _read_extended_file_content(
         source: Source identifier for the result
         file_source_type: Type of source file
         distance: Similarity distance for the result
+        anchor: Optional (start_index, byte_start) of a matched chunk inside the window
 
     Returns:
         Optional[SearchResult]: SearchResult object with the content, or None if reading fails
     """
-    content = _get_cached_file_content(file_path, file_source_type)
-    if content is None:
-        logger.warning(f"Content is None for {file_path}")
-        return None
-
-    try:
-        # Ensure indices are within bounds
-        start_index = max(0, start_index)
-        end_index = min(len(content), end_index)
-
-        if start_index >= end_index:
+    start_index = max(0, start_index)
+    if file_source_type in _RANGE_READ_SOURCE_TYPES:
+        # Plain text is read window by window, caching the whole file would only waste memory
+        extracted_content = ReaderFactory.create_reader(file_path).read_range(start_index, end_index, anchor)
+    else:
+        content = _get_cached_file_content(file_path, file_source_type)
+        if content is None:
+            logger.warning(f"Content is None for {file_path}")
             return None
-
         extracted_content = content[start_index:end_index]
 
-        return SearchResult(
-            text=extracted_content,
-            source=source,
-            source_type=file_source_type,
-            start_index=start_index,
-            end_index=end_index,
-            distance=distance,
-        )
-
-    except Exception as e:
-        logger.warning(f"Error extracting content from {file_path} at indices {start_index}:{end_index}: {e}")
+    # Ensure indices are within bounds
+    end_index = min(end_index, start_index + len(extracted_content))
+    if start_index >= end_index:
         return None
 
+    return SearchResult(
+        text=extracted_content,
+        source=source,
+        source_type=file_source_type,
+        start_index=start_index,
+        end_index=end_index,
+        distance=distance,
+    )
+
+
+# \S uses the same definition of whitespace as str.isspace
+_NON_WHITESPACE_RE = re.compile(r"\S")
+
 
 # TODO:
 # this is only used when generating embeddings for user queries
@@ -187,13 +266,14 @@ def _cut_line_into_chunks(line: str, base_index: int = 0) -> List[TextChunk]:
     Returns:
         List[TextChunk]: List of TextChunk objects containing the split text
     """
-    if not line.strip():
+    if not line or line.isspace():
         return []
 
     chunks = []
     line_length = len(line)
+    chunk_limit = SEARCH_CHUNK_CHARACTER_LIMIT.value
 
-    if line_length <= SEARCH_CHUNK_CHARACTER_LIMIT.value:
+    if line_length <= chunk_limit:
         sanitized_text = line.strip()
         if sanitized_text:  # Only add non-empty chunks
             chunks.append(TextChunk(base_index, base_index + line_length, sanitized_text))
@@ -201,7 +281,7 @@ def _cut_line_into_chunks(line: str, base_index: int = 0) -> List[TextChunk]:
         # Split into chunks, trying to break at word boundaries
         current_pos = 0
         while current_pos < line_length:
-            chunk_end = min(current_pos + SEARCH_CHUNK_CHARACTER_LIMIT.value, line_length)
+            chunk_end = min(current_pos + chunk_limit, line_length)
 
             # Try to break at word boundary if not at the end of line
             if chunk_end < line_length:
@@ -214,10 +294,9 @@ def _cut_line_into_chunks(line: str, base_index: int = 0) -> List[TextChunk]:
             if chunk_text:  # Only add non-empty chunks
                 chunks.append(TextChunk(base_index + current_pos, base_index + chunk_end, chunk_text))
 
-            current_pos = chunk_end
-            # Skip whitespace at the beginning of next chunk
-            while current_pos < line_length and line[current_pos].isspace():
-                current_pos += 1
+            # Skip whitespace at the beginning of next chunk, scanning in C rather than char by char
+            next_word = _NON_WHITESPACE_RE.search(line, chunk_end)
+            current_pos = next_word.start() if next_word is not None else line_length
 
     return chunks
 
@@ -234,7 +313,7 @@ def _embed_user_query(query: str, embedder_read_queue: BulkQueue) -> List[str]:
         List[str]: List of query IDs for tracking
     """
     logger.info(f"Embedding user query: {query}")
-    if not query.strip():
+    if not query or query.isspace():
         return []
 
     query_ids: List[str] = []
@@ -265,14 +344,39 @@ def _embed_user_query(query: str, embedder_read_queue: BulkQueue) -> List[str]:
                 source_id=query_id,
             )
             text_inputs.append(ti)
-    embedder_read_queue.put_many(text_inputs)
+    # Register before submitting so the storage thread cannot signal before anyone listens
+    with _query_stored_events_lock:
+        for query_id in query_ids:
+            _query_stored_events[query_id] = threading.Event()
+    try:
+        embedder_read_queue.put_many(text_inputs)
+    except BaseException:
+        # No waiter will ever pop these events, drop them before surfacing the error
+        with _query_stored_events_lock:
+            for query_id in query_ids:
+                _query_stored_events.pop(query_id, None)
+        raise
     logger.debug(f"Finished submitting {len(query_ids)} chunks for embedding")
     return query_ids
 
 
+def notify_query_embeddings_stored(query_ids: Iterable[str]):
+    """
+    Wake up the searches waiting for these user query embeddings
+
+    Args:
+        query_ids: IDs of the user queries whose embeddings were just stored
+    """
+    with _query_stored_events_lock:
+        events = [_query_stored_events.get(query_id) for query_id in query_ids]
+    for event in events:
+        if event is not None:
+            event.set()
+
+
 def _wait_for_embeddings(query_ids: List[str], data_source_map: DataSourceMap) -> bool:
     """
-    Wait for query embeddings to be processed with adaptive polling
+    Wait for query embeddings to be stored, woken up by notify_query_embeddings_stored
 
     Args:
         query_ids: List of query IDs to wait for
@@ -281,25 +385,87 @@ def _wait_for_embeddings(query_ids: List[str], data_source_map: DataSourceMap) -
     Returns:
         bool: True if all embeddings are ready, False if timeout occurs
     """
-    # Wait for processing to complete with optimized polling
-    start_time = time.time()
-    check_interval = 0.01  # Start with faster polling
-    max_interval = 0.5  # Maximum polling interval
+    deadline = time.monotonic() + SEARCH_PROCESSING_TIMEOUT_SECONDS.value
     logger.debug(f"Waiting for {query_ids} embeddings to be ready")
-    while time.time() - start_time < SEARCH_PROCESSING_TIMEOUT_SECONDS.value:
-        # Check if all query embeddings are ready
-        ready_count = sum(
-            1 for query_id in query_ids if data_source_map.get_text_input_by_id(query_id, USER_QUERY_SOURCE) is not None
-        )
+    with _query_stored_events_lock:
+        events = [_query_stored_events.get(query_id) for query_id in query_ids]
+    try:
+        for query_id, event in zip(query_ids, events):
+            if event is not None and event.wait(max(0.0, deadline - time.monotonic())):
+                continue
+            # Not signalled in time (or never registered), the store has the final say
+            if data_source_map.get_text_input_by_id(query_id, USER_QUERY_SOURCE) is None:
+                return False
+        return True
+    finally:
+        with _query_stored_events_lock:
+            for query_id in query_ids:
+                _query_stored_events.pop(query_id, None)
 
-        if ready_count == len(query_ids):
-            return True
 
-        # Adaptive polling - start fast, then slow down
-        time.sleep(check_interval)
-        check_interval = min(check_interval * 1.2, max_interval)
+def _get_query_vectors(query: str, embedder_read_queue: BulkQueue, data_source_map: DataSourceMap) -> List[np.ndarray]:
+    """
+    Get the embeddings of a query, from the cache or by submitting it to the embedder
 
-    return False
+    Args:
+        query: The user query text
+        embedder_read_queue: Queue to submit text chunks for embedding
+        data_source_map: Data source map the query embeddings are written to
+
+    Returns:
+        List[np.ndarray]: One vector per embedded query line
+
+    Raises:
+        MCPError: If the embeddings are not ready before SEARCH_PROCESSING_TIMEOUT_SECONDS
+    """
+    with _query_vectors_cache_lock:
+        vectors = _query_vectors_cache.get(query)
+        if vectors is not None:
+            _query_vectors_cache.move_to_end(query)
+            logger.debug("Using cached embeddings for user query")
+            return vectors
+
+    query_ids = _embed_user_query(query, embedder_read_queue)
+
+    if not _wait_for_embeddings(query_ids, data_source_map):
+        raise MCPError("Timeout waiting for embeddings")
+
+    vectors = []
+    for query_id in query_ids:
+        text_input = data_source_map.get_text_input_by_id(query_id, USER_QUERY_SOURCE)
+        if text_input is None or text_input._vec is None:
+            logger.warning(f"Query {query_id} is None or has no vector. text_input={text_input}")
+            continue
+        vectors.append(text_input._vec)
+
+    # Only cache complete results so a partially embedded query is retried next time
+    cache_size = QUERY_VECTORS_CACHE_SIZE.value
+    if vectors and len(vectors) == len(query_ids) and cache_size > 0:
+        with _query_vectors_cache_lock:
+            _query_vectors_cache[query] = vectors
+            _query_vectors_cache.move_to_end(query)
+            while len(_query_vectors_cache) > cache_size:
+                _query_vectors_cache.popitem(last=False)
+    return vectors
+
+
+R = TypeVar("R")
+
+
+def _map_query_vectors(func: Callable[[np.ndarray], R], vectors: List[np.ndarray]) -> List[R]:
+    """
+    Apply func to every query vector, concurrently when there is more than one
+
+    Args:
+        func: Search to run for a single query vector
+        vectors: Query vectors, one per embedded query line
+
+    Returns:
+        List[R]: The results of func, in the order of vectors
+    """
+    if len(vectors) <= 1:
+        return [func(vector) for vector in vectors]
+    return list(_query_search_executor.map(func, vectors))
 
 
 def _search_vector_in_data_source(
@@ -353,6 +519,14 @@ def _search_vector_in_data_source(
 
         source_type = results_for_source[0]._meta["source_type"]
 
+        # Byte offsets recorded at ingestion let plain text windows be read without decoding up to them
+        anchors = sorted(
+            (result._meta["start_index"], result._meta["byte_start"])
+            for result in results_for_source
+            if result._meta.get("byte_start") is not None
+        )
+        anchor_indices = [anchor_index for anchor_index, _ in anchors]
+
         for start_index, end_index, distance in extended_indices_with_distance:
             if source_type == SourceType.USER_QUERY:
                 logger.warning(
@@ -360,8 +534,12 @@ def _search_vector_in_data_source(
                 )
                 continue
 
+            # Every window contains at least one of the matched chunks it was built from
+            position = bisect_left(anchor_indices, start_index)
+            anchor = anchors[position] if position < len(anchors) and anchors[position][0] < end_index else None
+
             search_result = _read_extended_file_content(
-                start_index, end_index, file_path, source, source_type, distance
+                start_index, end_index, file_path, source, source_type, distance, anchor
             )
             if search_result is not None:
                 results.append(search_result)
@@ -395,32 +573,25 @@ def search(
         List of relevant SearchResult objects found in data sources
 
     Note:
+        - Reuses the embeddings of the last QUERY_VECTORS_CACHE_SIZE queries
         - Limits the number of query chunks to SEARCH_CHUNKS_LIMIT
         - Times out after SEARCH_PROCESSING_TIMEOUT_SECONDS
         - Extends matched content by SEARCH_CONTEXT_EXTENSION_CHARACTERS
     """
-    query_ids = _embed_user_query(query, embedder_read_queue)
-
-    if not _wait_for_embeddings(query_ids, data_source_map):
-        raise MCPError("Timeout waiting for embeddings")
-
     # Collect results from all data sources
     results: List[SearchResult] = []
 
-    for query_id in query_ids:
-        text_input = data_source_map.get_text_input_by_id(query_id, USER_QUERY_SOURCE)
-        if text_input is None or text_input._vec is None:
-            logger.warning(f"Query {query_id} is None or has no vector. text_input={text_input}")
-            continue
-
-        # Search across all non-query data sources
-        data_source_results = _search_vector_in_data_source(text_input._vec, data_source_map, sources, limit + offset)
+    # Search across all non-query data sources
+    all_data_source_results = _map_query_vectors(
+        lambda vector: _search_vector_in_data_source(vector, data_source_map, sources, limit + offset),
+        _get_query_vectors(query, embedder_read_queue, data_source_map),
+    )
+    for data_source_results in all_data_source_results:
         results.extend(data_source_results)
         logger.debug(f"Found {len(data_source_results)} results")
 
-    results = results[offset : offset + limit]
-
-    return [result for result in sorted(results, key=lambda x: x.distance)]
+    # Rank before paginating, only the limit + offset best results need to be ordered
+    return heapq.nsmallest(limit + offset, results, key=attrgetter("distance"))[offset:]
 
 
 def most_relevant_sources(
@@ -443,21 +614,13 @@ def most_relevant_sources(
     Returns:
         List[Dict[str, Any]]: List of relevant sources with distance metrics
     """
-    query_ids = _embed_user_query(query, embedder_read_queue)
-
-    if not _wait_for_embeddings(query_ids, data_source_map):
-        raise MCPError("Timeout waiting for embeddings")
-
     relevant_sources_grouped_by_query: Dict[str, RelevantCollection] = {}
 
-    for query_id in query_ids:
-        text_input = data_source_map.get_text_input_by_id(query_id, USER_QUERY_SOURCE)
-        if text_input is None or text_input._vec is None:
-            logger.warning(f"Query {query_id} is None or has no vector. text_input={text_input}")
-            continue
-
-        relevant_sources = data_source_map.get_relevant_sources(text_input._vec, limit, sources=sources)
-
+    all_relevant_sources = _map_query_vectors(
+        lambda vector: data_source_map.get_relevant_sources(vector, limit, sources=sources),
+        _get_query_vectors(query, embedder_read_queue, data_source_map),
+    )
+    for relevant_sources in all_relevant_sources:
         for relevant_source in relevant_sources:
             if relevant_source.collection not in relevant_sources_grouped_by_query:
                 relevant_sources_grouped_by_query[relevant_source.collection] = relevant_source
@@ -13,6 +13,10 @@ SEARCH_CONTEXT_EXTENSION_CHARACTERS = Constant(1000, env_var="SEARCH_CONTEXT_EXT
 SEARCH_RESULT_LIMIT = Constant(5, "SEARCH_RESULT_LIMIT")
 DEEP_SEARCH_RESULT_LIMIT = Constant(30, "DEEP_SEARCH_RESULT_LIMIT")
 MAX_SOURCES_IN_DEEP_SEARCH = Constant(3, "MAX_SOURCES_IN_DEEP_SEARCH")
+# Number of recent queries whose embeddings are kept in memory, 0 disables the cache
+QUERY_VECTORS_CACHE_SIZE = Constant(128, env_var="QUERY_VECTORS_CACHE_SIZE")
+# Number of files whose content is kept in memory to extend search results, 0 disables the cache
+FILE_CONTENT_CACHE_SIZE = Constant(32, env_var="FILE_CONTENT_CACHE_SIZE")
 
 # MCP configuration
 MCP_HOST = Constant("localhost", env_var="MCP_HOST")
@@ -1,5 +1,4 @@
 import threading
-import time
 from collections import defaultdict
 from enum import Enum
 from typing import Tuple
@@ -11,9 +10,10 @@ from embedder.constants import ASYNC_QUEUE_MAX_SIZE, app_dir_path
 from embedder.embed import Embedder
 from embedder.read_write.bulk_queue import BulkQueue
 from embedder.store import VectorStoreType, get_vector_store
-from embedder.store.store import CollectionState, DataSourceMap
+from embedder.store.store import USER_QUERY_SOURCE, CollectionState, DataSourceMap
 from embedder.text import TextInput
 from server.api.mcp import get_mcp_middleware, initialize_dependencies, mcp
+from server.api.search import notify_query_embeddings_stored
 from server.shared import get_ingestion_state_manager
 from server.thread_managers.embedder_manager import EmbedderThreadManager
 from server.workers.ingestion_state_manager import (
@@ -101,7 +101,8 @@ def run_continuous_storage(data_source_map: DataSourceMap, read_queue: BulkQueue
     while True:
         text_inputs = read_queue.get_many(1000)
         if len(text_inputs) == 0:
-            time.sleep(1)
+            # Woken up as soon as the embedder writes, searches are waiting on these
+            read_queue.wait_not_empty(1)
             continue
         logger.debug(f"Received {len(text_inputs)} text inputs for storage")
 
@@ -119,6 +120,8 @@ def run_continuous_storage(data_source_map: DataSourceMap, read_queue: BulkQueue
 
             logger.debug(f"Storing {len(valid_text_inputs)} text inputs for source: {source}")
             data_source_map.get(source).add_batch(valid_text_inputs)
+            if source == USER_QUERY_SOURCE:
+                notify_query_embeddings_stored(text_input._meta["id"] for text_input in valid_text_inputs)
             ingestion_state_manager = get_ingestion_state_manager()
             ingestion_state_manager.increment_phase_progress(source, IngestionPhase.STORING, len(valid_text_inputs))
             if (ingestion_state_manager.get_phase_percentage(source, IngestionPhase.STORING) or 0) >= 100:
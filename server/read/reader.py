@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Iterator
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from server.constants import CHUNK_CHARACTER_LIMIT
 
@@ -14,23 +14,28 @@ class TextChunk:
         start_index: The starting character index of the chunk in the original text
         end_index: The ending character index of the chunk in the original text
         text: The actual text content of the chunk
+        byte_start: The byte offset of start_index in the source file, for readers that can seek into it
     """
 
     start_index: int
     end_index: int
     text: str
+    byte_start: Optional[int] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert the TextChunk to a dictionary representation.
 
         Returns:
-            Dict containing the chunk's start_index, end_index, and text
+            Dict containing the chunk's start_index, end_index, text and byte_start when known
         """
-        return {
+        chunk = {
             "start_index": self.start_index,
             "end_index": self.end_index,
             "text": self.text,
         }
+        if self.byte_start is not None:
+            chunk["byte_start"] = self.byte_start
+        return chunk
 
 
 class SourceType(str, Enum):
@@ -57,6 +62,23 @@ class Reader(ABC):
     def read(self) -> str:
         pass
 
+    def read_range(self, start_index: int, end_index: int, anchor: Optional[Tuple[int, int]] = None) -> str:
+        """
+        Read the characters between start_index and end_index of the text returned by read.
+
+        Readers that cannot seek into their source decode the whole document and slice it.
+
+        Args:
+            start_index: Index of the first character to read
+            end_index: Index one past the last character to read
+            anchor: Optional (start_index, byte_start) of a chunk inside the range, lets seekable
+                readers jump straight to the range
+
+        Returns:
+            str: The requested characters, shorter than requested if the text ends first
+        """
+        return self.read()[start_index:end_index]
+
     @abstractmethod
     def read_iter(self) -> Iterator[TextChunk]:
         pass
@@ -1,8 +1,13 @@
-from typing import Iterator
+from typing import Iterator, Optional, Tuple
 
 from server.constants import CHUNK_CHARACTER_LIMIT
 from server.read.reader import Reader, SourceType, TextChunk
 
+# Number of characters decoded at a time while skipping to the start of a range
+_SKIP_BLOCK_CHARACTERS = 1 << 16
+# Upper bound of the bytes a single character of the read text can take in the file (utf-8 or \r\n)
+_MAX_BYTES_PER_CHARACTER = 4
+
 
 class TextReader(Reader):
     file_path: str
@@ -19,6 +24,63 @@ class TextReader(Reader):
         with open(self.file_path, "r", encoding="utf-8") as file:
             return file.read()
 
+    def read_range(self, start_index: int, end_index: int, anchor: Optional[Tuple[int, int]] = None) -> str:
+        """
+        Read a character range without holding the rest of the file in memory.
+
+        With an anchor only the bytes around the anchor chunk are read. Without one,
+        characters are decoded in blocks until start_index is reached. Either way the
+        indices match the ones produced by read and read_iter even for multi-byte characters.
+
+        Args:
+            start_index: Index of the first character to read
+            end_index: Index one past the last character to read
+            anchor: Optional (start_index, byte_start) of a chunk produced by read_iter inside the range
+
+        Returns:
+            str: The requested characters, shorter than requested if the file ends first
+        """
+        if anchor is not None:
+            return self._read_range_around(start_index, end_index, *anchor)
+
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            to_skip = start_index
+            while to_skip > 0:
+                skipped = len(file.read(min(to_skip, _SKIP_BLOCK_CHARACTERS)))
+                if not skipped:
+                    return ""
+                to_skip -= skipped
+            return file.read(max(0, end_index - start_index))
+
+    def _read_range_around(self, start_index: int, end_index: int, anchor_index: int, anchor_byte: int) -> str:
+        """
+        Read a character range by seeking to the bytes around a chunk with a known byte offset.
+
+        Enough bytes are read on each side of the anchor to hold the requested characters,
+        then decoded and trimmed to the exact number of characters before and after it.
+
+        Args:
+            start_index: Index of the first character to read
+            end_index: Index one past the last character to read
+            anchor_index: Character index of the anchor, between start_index and end_index
+            anchor_byte: Byte offset of the anchor in the file
+
+        Returns:
+            str: The requested characters, shorter than requested if the file ends first
+        """
+        characters_before = max(0, anchor_index - start_index)
+        characters_after = max(0, end_index - anchor_index)
+        window_start = max(0, anchor_byte - characters_before * _MAX_BYTES_PER_CHARACTER)
+
+        with open(self.file_path, "rb") as file:
+            file.seek(window_start)
+            window = file.read(anchor_byte - window_start + characters_after * _MAX_BYTES_PER_CHARACTER)
+
+        split = anchor_byte - window_start
+        before = _decode_window(window[:split])
+        after = _decode_window(window[split:])
+        return (before[-characters_before:] if characters_before else "") + after[:characters_after]
+
     def read_iter(self) -> Iterator[TextChunk]:
         """
         Read the file line by line and yield TextChunk objects.
@@ -32,17 +94,23 @@ class TextReader(Reader):
             TextChunk: Chunk containing line text and its character indices
         """
         char_index = 0
+        byte_index = 0
 
-        with open(self.file_path, "r", encoding="utf-8") as file:
+        # Newlines are not translated so the byte offset of every line is known, the character
+        # indices still count each line ending as the single "\n" that read returns
+        with open(self.file_path, "r", encoding="utf-8", newline="") as file:
             for line in file:
-                line_length = len(line)
+                line_length = len(line) - 1 if line.endswith("\r\n") else len(line)
 
                 # Only process non-empty lines (after stripping)
                 if line.strip():
                     # Create a TextChunk for this line
                     line_text = line.rstrip("\n\r")  # Remove trailing newlines but keep the text
                     line_chunk = TextChunk(
-                        start_index=char_index, end_index=char_index + len(line_text), text=line_text
+                        start_index=char_index,
+                        end_index=char_index + len(line_text),
+                        text=line_text,
+                        byte_start=byte_index,
                     )
 
                     # Split the line chunk if it exceeds the size limit
@@ -52,6 +120,7 @@ class TextReader(Reader):
                 # Always advance the character index by the full line length
                 # (including newline characters)
                 char_index += line_length
+                byte_index += len(line.encode("utf-8"))
 
 
 def _split_text_chunk(chunk_size_max: int, text_chunk: TextChunk) -> Iterator[TextChunk]:
@@ -76,6 +145,9 @@ def _split_text_chunk(chunk_size_max: int, text_chunk: TextChunk) -> Iterator[Te
     # Split the text into smaller chunks
     start_pos = 0
     original_start = text_chunk.start_index
+    # Byte offset of start_pos, advanced incrementally so the line is encoded only once overall
+    byte_pos = text_chunk.byte_start
+    byte_pos_index = 0
 
     while start_pos < len(text):
         end_pos = min(start_pos + chunk_size_max, len(text))
@@ -94,9 +166,29 @@ def _split_text_chunk(chunk_size_max: int, text_chunk: TextChunk) -> Iterator[Te
             chunk_start = original_start + start_pos
             chunk_end = original_start + end_pos
 
-            yield TextChunk(start_index=chunk_start, end_index=chunk_end, text=chunk_text)
+            if byte_pos is not None:
+                byte_pos += len(text[byte_pos_index:start_pos].encode("utf-8"))
+                byte_pos_index = start_pos
+
+            yield TextChunk(start_index=chunk_start, end_index=chunk_end, text=chunk_text, byte_start=byte_pos)
 
         start_pos = end_pos
         # Skip any whitespace at the beginning of the next chunk
         while start_pos < len(text) and text[start_pos].isspace():
             start_pos += 1
+
+
+def _decode_window(window: bytes) -> str:
+    """
+    Decode bytes cut out of a text file the way read decodes the whole file.
+
+    Characters cut in half at the edges of the window are dropped and line endings
+    are translated to "\n".
+
+    Args:
+        window: Raw bytes of the file
+
+    Returns:
+        str: The decoded text
+    """
+    return window.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
@@ -105,11 +105,11 @@ class ActiveDataSources(metaclass=Singleton):
         Returns:
             List[str]: List of valid data sources
         """
-        available_sources = global_data_source_map.get().list_sources()
-        unknown_data_sources = set(data_sources) - set(available_sources)
-        if unknown_data_sources:
-            logger.warning(f"Unknown data sources: {unknown_data_sources}")
-        return list(set(data_sources) - unknown_data_sources)
+        requested_data_sources = set(data_sources)
+        valid_data_sources = requested_data_sources.intersection(global_data_source_map.get().list_sources())
+        if len(valid_data_sources) < len(requested_data_sources):
+            logger.warning(f"Unknown data sources: {requested_data_sources - valid_data_sources}")
+        return list(valid_data_sources)
 
 
 def check_dependencies():
@@ -122,6 +122,8 @@ class DownloadManager(SelfTerminatingThreadManager):
             self.mark_as_active()
             self._process_url(url)
 
+        # Producers only wake the consumer on an edge, let them know it stopped
+        self._download_queue.mark_consumer_asleep()
         logger.info("YouTube download consumer thread terminated")
 
     def name(self) -> str:
@@ -44,6 +44,8 @@ class EmbedderThreadManager(SelfTerminatingThreadManager):
                     break
                 time.sleep(0.3)
 
+        # Producers only wake the consumer on an edge, let them know it stopped
+        self._read_queue.mark_consumer_asleep()
         # Free resources before exiting
         embedder._vectorizer.free()
         logger.info("Embedder thread terminated")
@@ -92,6 +92,8 @@ class TranscriptionThreadManager(SelfTerminatingThreadManager):
                 {"transcription_path": transcript_path},
             )
 
+        # Producers only wake the consumer on an edge, let them know it stopped
+        self._transcription_queue.mark_consumer_asleep()
         self._provider.free()
         logger.info("Transcription thread terminated")
 
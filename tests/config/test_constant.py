@@ -2,13 +2,25 @@ import concurrent.futures
 import os
 import threading
 import time
+from contextlib import contextmanager
 from datetime import timedelta
-from typing import Dict, List
+from typing import Dict, Iterator, List
 from unittest import mock
 
 from common.config.constant import Constant
 
 
+@contextmanager
+def patched_env(values: Dict[str, str], clear: bool = False) -> Iterator[None]:
+    """Patch os.environ and refresh the snapshot Constant reads from."""
+    try:
+        with mock.patch.dict(os.environ, values, clear=clear):
+            Constant.refresh_env_snapshot()
+            yield
+    finally:
+        Constant.refresh_env_snapshot()
+
+
 class TestConstantBasicFunctionality:
     def test_basic_get_set_operations(self):
         const = Constant(42, "test_basic")
@@ -289,33 +301,33 @@ class TestConstantEdgeCases:
 
 class TestConstantEnvironmentVariables:
     def test_string_from_environment(self):
-        with mock.patch.dict(os.environ, {"TEST_STRING": "from_env"}):
+        with patched_env({"TEST_STRING": "from_env"}):
             const = Constant("default", "env_str_test", env_var="TEST_STRING")
             assert const.value == "from_env"
 
     def test_string_fallback_to_default(self):
-        with mock.patch.dict(os.environ, {}, clear=True):
+        with patched_env({}, clear=True):
             const = Constant("default_value", "env_str_fallback", env_var="MISSING_VAR")
             assert const.value == "default_value"
 
     def test_integer_from_environment(self):
-        with mock.patch.dict(os.environ, {"TEST_INT": "42"}):
+        with patched_env({"TEST_INT": "42"}):
             const = Constant(0, "env_int_test", env_var="TEST_INT")
             assert const.value == 42
             assert isinstance(const.value, int)
 
     def test_integer_fallback_to_default(self):
-        with mock.patch.dict(os.environ, {}, clear=True):
+        with patched_env({}, clear=True):
             const = Constant(100, "env_int_fallback", env_var="MISSING_INT")
             assert const.value == 100
 
     def test_integer_invalid_conversion_fallback(self):
-        with mock.patch.dict(os.environ, {"TEST_INT": "not_a_number"}):
+        with patched_env({"TEST_INT": "not_a_number"}):
             const = Constant(999, "env_int_invalid", env_var="TEST_INT")
             assert const.value == 999
 
     def test_float_from_environment(self):
-        with mock.patch.dict(os.environ, {"TEST_FLOAT": "3.14159"}):
+        with patched_env({"TEST_FLOAT": "3.14159"}):
             const = Constant(0.0, "env_float_test", env_var="TEST_FLOAT")
             assert const.value == 3.14159
             assert isinstance(const.value, float)
@@ -323,55 +335,55 @@ class TestConstantEnvironmentVariables:
     def test_boolean_true_values_from_environment(self):
         true_values = ["true", "True", "TRUE", "1", "yes", "Yes", "on", "On"]
         for i, true_val in enumerate(true_values):
-            with mock.patch.dict(os.environ, {"TEST_BOOL": true_val}):
+            with patched_env({"TEST_BOOL": true_val}):
                 const = Constant(False, f"env_bool_true_{i}", env_var="TEST_BOOL")
                 assert const.value is True
 
     def test_boolean_false_values_from_environment(self):
         false_values = ["false", "False", "FALSE", "0", "no", "No", "off", "Off", "anything_else"]
         for i, false_val in enumerate(false_values):
-            with mock.patch.dict(os.environ, {"TEST_BOOL": false_val}):
+            with patched_env({"TEST_BOOL": false_val}):
                 const = Constant(True, f"env_bool_false_{i}", env_var="TEST_BOOL")
                 assert const.value is False
 
     def test_list_from_environment_comma_separated(self):
-        with mock.patch.dict(os.environ, {"TEST_LIST": "item1, item2, item3"}):
+        with patched_env({"TEST_LIST": "item1, item2, item3"}):
             const = Constant([], "env_list_test", env_var="TEST_LIST")
             assert const.value == ["item1", "item2", "item3"]
 
     def test_list_from_environment_empty_string(self):
-        with mock.patch.dict(os.environ, {"TEST_LIST": ""}):
+        with patched_env({"TEST_LIST": ""}):
             const = Constant(["default"], "env_list_empty", env_var="TEST_LIST")
             assert const.value == []
 
     def test_list_from_environment_single_item(self):
-        with mock.patch.dict(os.environ, {"TEST_LIST": "single_item"}):
+        with patched_env({"TEST_LIST": "single_item"}):
             const = Constant([], "env_list_single", env_var="TEST_LIST")
             assert const.value == ["single_item"]
 
     def test_dict_from_environment_json(self):
-        with mock.patch.dict(os.environ, {"TEST_DICT": '{"key": "value", "number": 42}'}):
+        with patched_env({"TEST_DICT": '{"key": "value", "number": 42}'}):
             const = Constant({}, "env_dict_test", env_var="TEST_DICT")
             assert const.value == {"key": "value", "number": 42}
 
     def test_dict_from_environment_invalid_json_fallback(self):
-        with mock.patch.dict(os.environ, {"TEST_DICT": "not_valid_json"}):
+        with patched_env({"TEST_DICT": "not_valid_json"}):
             default_dict = {"default": "value"}
             const = Constant(default_dict, "env_dict_invalid", env_var="TEST_DICT")
             assert const.value == default_dict
 
     def test_none_default_with_environment(self):
-        with mock.patch.dict(os.environ, {"TEST_NONE": "some_value"}):
+        with patched_env({"TEST_NONE": "some_value"}):
             const = Constant(None, "env_none_test", env_var="TEST_NONE")
             assert const.value == "some_value"
 
     def test_none_default_without_environment(self):
-        with mock.patch.dict(os.environ, {}, clear=True):
+        with patched_env({}, clear=True):
             const = Constant(None, "env_none_fallback", env_var="MISSING_VAR")
             assert const.value is None
 
     def test_environment_variable_singleton_behavior(self):
-        with mock.patch.dict(os.environ, {"SINGLETON_TEST": "env_value"}):
+        with patched_env({"SINGLETON_TEST": "env_value"}):
             const1 = Constant("default", "env_singleton", env_var="SINGLETON_TEST")
             const2 = Constant("different_default", "env_singleton", env_var="SINGLETON_TEST")
 
@@ -380,7 +392,7 @@ class TestConstantEnvironmentVariables:
             assert const2.value == "env_value"
 
     def test_environment_variable_with_manual_override(self):
-        with mock.patch.dict(os.environ, {"OVERRIDE_TEST": "from_env"}):
+        with patched_env({"OVERRIDE_TEST": "from_env"}):
             const = Constant("default", "env_override", env_var="OVERRIDE_TEST")
             assert const.value == "from_env"
 
@@ -395,13 +407,13 @@ class TestConstantEnvironmentVariables:
                 self.value = value
 
         custom_default = CustomType("default")
-        with mock.patch.dict(os.environ, {"CUSTOM_TEST": "string_value"}):
+        with patched_env({"CUSTOM_TEST": "string_value"}):
             const = Constant(custom_default, "env_custom", env_var="CUSTOM_TEST")
             assert const.value == "string_value"  # Should be the string, not CustomType
 
     def test_environment_variable_type_consistency(self):
         # Test that the same env var consistently converts to the expected type
-        with mock.patch.dict(os.environ, {"CONSISTENT_TEST": "123"}):
+        with patched_env({"CONSISTENT_TEST": "123"}):
             int_const = Constant(0, "env_int_consistent", env_var="CONSISTENT_TEST")
             str_const = Constant("", "env_str_consistent", env_var="CONSISTENT_TEST")
             float_const = Constant(0.0, "env_float_consistent", env_var="CONSISTENT_TEST")
@@ -416,13 +428,13 @@ class TestConstantEnvironmentVariables:
             assert isinstance(float_const.value, float)
 
     def test_timedelta_from_environment(self):
-        with mock.patch.dict(os.environ, {"TEST_TIMEDELTA": "3600"}):
+        with patched_env({"TEST_TIMEDELTA": "3600"}):
             const = Constant(timedelta(seconds=0), "env_timedelta_test", env_var="TEST_TIMEDELTA")
             assert const.value == timedelta(seconds=3600)
             assert isinstance(const.value, timedelta)
 
     def test_timedelta_invalid_conversion_fallback(self):
-        with mock.patch.dict(os.environ, {"TEST_TIMEDELTA": "not_a_number"}):
+        with patched_env({"TEST_TIMEDELTA": "not_a_number"}):
             default_td = timedelta(minutes=5)
             const = Constant(default_td, "env_timedelta_invalid", env_var="TEST_TIMEDELTA")
             assert const.value == default_td
@@ -430,7 +442,7 @@ class TestConstantEnvironmentVariables:
     def test_multiple_environment_variable_instances(self):
         # Test that different instances with same env var but different identifiers
         # still read from the environment
-        with mock.patch.dict(os.environ, {"SHARED_ENV": "shared_value"}):
+        with patched_env({"SHARED_ENV": "shared_value"}):
             const1 = Constant("default1", "instance1", env_var="SHARED_ENV")
             const2 = Constant("default2", "instance2", env_var="SHARED_ENV")
 
@@ -439,17 +451,17 @@ class TestConstantEnvironmentVariables:
             assert const1 is not const2  # Different instances
 
     def test_environment_variable_with_spaces(self):
-        with mock.patch.dict(os.environ, {"TEST_SPACES": "  value with spaces  "}):
+        with patched_env({"TEST_SPACES": "  value with spaces  "}):
             const = Constant("", "env_spaces", env_var="TEST_SPACES")
             assert const.value == "  value with spaces  "  # Preserves spaces for strings
 
     def test_list_with_spaces_in_items(self):
-        with mock.patch.dict(os.environ, {"TEST_LIST_SPACES": "item 1, item 2, item 3"}):
+        with patched_env({"TEST_LIST_SPACES": "item 1, item 2, item 3"}):
             const = Constant([], "env_list_spaces", env_var="TEST_LIST_SPACES")
             assert const.value == ["item 1", "item 2", "item 3"]
 
     def test_empty_environment_variable(self):
-        with mock.patch.dict(os.environ, {"TEST_EMPTY": ""}):
+        with patched_env({"TEST_EMPTY": ""}):
             # String should return empty string
             str_const = Constant("default", "env_empty_str", env_var="TEST_EMPTY")
             assert str_const.value == ""
@@ -462,7 +474,7 @@ class TestConstantEnvironmentVariables:
         results = []
 
         def create_const_worker(worker_id: int):
-            with mock.patch.dict(os.environ, {"THREAD_TEST": f"value_{worker_id}"}):
+            with patched_env({"THREAD_TEST": f"value_{worker_id}"}):
                 # Each thread sets a different env value
                 const = Constant("default", f"thread_env_{worker_id}", env_var="THREAD_TEST")
                 results.append((worker_id, const.value))
@@ -484,48 +496,48 @@ class TestConstantEnvironmentVariables:
         complex_json = {"nested": {"array": [1, 2, 3], "string": "value", "bool": True}, "list": ["a", "b", "c"]}
         json_str = '{"nested": {"array": [1, 2, 3], "string": "value", "bool": true}, "list": ["a", "b", "c"]}'
 
-        with mock.patch.dict(os.environ, {"TEST_COMPLEX_JSON": json_str}):
+        with patched_env({"TEST_COMPLEX_JSON": json_str}):
             const = Constant({}, "env_complex_json", env_var="TEST_COMPLEX_JSON")
             assert const.value == complex_json
 
     def test_unicode_from_environment(self):
-        with mock.patch.dict(os.environ, {"TEST_UNICODE": "Hello 世界 🌍"}):
+        with patched_env({"TEST_UNICODE": "Hello 世界 🌍"}):
             const = Constant("", "env_unicode", env_var="TEST_UNICODE")
             assert const.value == "Hello 世界 🌍"
 
     def test_numeric_string_not_converted_for_string_type(self):
-        with mock.patch.dict(os.environ, {"TEST_NUMERIC_STR": "123"}):
+        with patched_env({"TEST_NUMERIC_STR": "123"}):
             const = Constant("", "env_numeric_str", env_var="TEST_NUMERIC_STR")
             assert const.value == "123"
             assert isinstance(const.value, str)
 
     def test_boolean_edge_cases(self):
         # Test empty string for boolean
-        with mock.patch.dict(os.environ, {"TEST_BOOL_EMPTY": ""}):
+        with patched_env({"TEST_BOOL_EMPTY": ""}):
             const = Constant(True, "env_bool_empty", env_var="TEST_BOOL_EMPTY")
             assert const.value is False  # Empty string should be False
 
         # Test numeric strings other than "1" for boolean
-        with mock.patch.dict(os.environ, {"TEST_BOOL_NUM": "123"}):
+        with patched_env({"TEST_BOOL_NUM": "123"}):
             const = Constant(True, "env_bool_num", env_var="TEST_BOOL_NUM")
             assert const.value is False  # Only "1" should be True
 
     def test_dict_with_single_quotes_fallback(self):
         # JSON requires double quotes, single quotes should fail
-        with mock.patch.dict(os.environ, {"TEST_DICT_SINGLE": "{'key': 'value'}"}):
+        with patched_env({"TEST_DICT_SINGLE": "{'key': 'value'}"}):
             default = {"default": "dict"}
             const = Constant(default, "env_dict_single", env_var="TEST_DICT_SINGLE")
             assert const.value == default  # Should fallback due to invalid JSON
 
     def test_list_with_json_array_format(self):
         # List type should parse comma-separated, not JSON arrays
-        with mock.patch.dict(os.environ, {"TEST_LIST_JSON": '["a", "b", "c"]'}):
+        with patched_env({"TEST_LIST_JSON": '["a", "b", "c"]'}):
             const = Constant([], "env_list_json", env_var="TEST_LIST_JSON")
             # Should treat the whole thing as one item since it's not comma-separated
             assert const.value == ['["a", "b", "c"]']
 
     def test_whitespace_only_environment_variable(self):
-        with mock.patch.dict(os.environ, {"TEST_WHITESPACE": "   \t\n   "}):
+        with patched_env({"TEST_WHITESPACE": "   \t\n   "}):
             # String should preserve whitespace
             str_const = Constant("default", "env_whitespace_str", env_var="TEST_WHITESPACE")
             assert str_const.value == "   \t\n   "
@@ -534,11 +546,21 @@ class TestConstantEnvironmentVariables:
             list_const = Constant(["default"], "env_whitespace_list", env_var="TEST_WHITESPACE")
             assert list_const.value == []
 
+    def test_environment_snapshot_requires_refresh(self):
+        with mock.patch.dict(os.environ, {"TEST_SNAPSHOT": "from_env"}):
+            stale = Constant("default", "env_snapshot_stale", env_var="TEST_SNAPSHOT")
+            assert stale.value == "default"
+
+            Constant.refresh_env_snapshot()
+            fresh = Constant("default", "env_snapshot_fresh", env_var="TEST_SNAPSHOT")
+            assert fresh.value == "from_env"
+        Constant.refresh_env_snapshot()
+
 
 class TestConstantIntegration:
     def test_singleton_with_env_var_consistency(self):
         # Create multiple constants with same identifier but different env vars
-        with mock.patch.dict(os.environ, {"ENV1": "value1", "ENV2": "value2"}):
+        with patched_env({"ENV1": "value1", "ENV2": "value2"}):
             const1 = Constant("default", "shared_id", env_var="ENV1")
             const2 = Constant("default", "shared_id", env_var="ENV2")
 
@@ -549,7 +571,7 @@ class TestConstantIntegration:
 
     def test_env_var_change_after_initialization(self):
         # Environment variable changes after initialization should not affect value
-        with mock.patch.dict(os.environ, {"CHANGE_TEST": "initial"}):
+        with patched_env({"CHANGE_TEST": "initial"}):
             const = Constant("default", "change_test", env_var="CHANGE_TEST")
             assert const.value == "initial"
 
@@ -565,7 +587,7 @@ class TestConstantIntegration:
 
         def init_worker(worker_id: int):
             barrier.wait()  # Ensure all threads start at same time
-            with mock.patch.dict(os.environ, {"CONCURRENT_TEST": f"worker_{worker_id}"}):
+            with patched_env({"CONCURRENT_TEST": f"worker_{worker_id}"}):
                 const = Constant("default", "concurrent_init", env_var="CONCURRENT_TEST")
                 results.append((worker_id, const.value))
 
@@ -585,7 +607,7 @@ class TestConstantIntegration:
 
     def test_env_var_with_type_hint_mismatch(self):
         # Type hint doesn't affect runtime behavior
-        with mock.patch.dict(os.environ, {"TYPE_HINT_TEST": "string_value"}):
+        with patched_env({"TYPE_HINT_TEST": "string_value"}):
             # Declare as int but env var is string
             const: Constant[int] = Constant(0, "type_hint_test", env_var="TYPE_HINT_TEST")
             # Should fall back to default since conversion fails
@@ -593,19 +615,19 @@ class TestConstantIntegration:
 
     def test_special_characters_in_env_var_name(self):
         # Test with valid env var names containing underscores, numbers
-        with mock.patch.dict(os.environ, {"TEST_VAR_123": "special_value"}):
+        with patched_env({"TEST_VAR_123": "special_value"}):
             const = Constant("default", "special_env", env_var="TEST_VAR_123")
             assert const.value == "special_value"
 
     def test_very_long_environment_value(self):
         long_value = "x" * 10000
-        with mock.patch.dict(os.environ, {"LONG_TEST": long_value}):
+        with patched_env({"LONG_TEST": long_value}):
             const = Constant("", "long_env", env_var="LONG_TEST")
             assert const.value == long_value
             assert len(const.value) == 10000
 
     def test_mixed_type_operations_with_env_vars(self):
-        with mock.patch.dict(os.environ, {"MIXED_INT": "42", "MIXED_STR": "hello"}):
+        with patched_env({"MIXED_INT": "42", "MIXED_STR": "hello"}):
             int_const = Constant(0, "mixed_int", env_var="MIXED_INT")
             str_const = Constant("", "mixed_str", env_var="MIXED_STR")
 
@@ -617,13 +639,13 @@ class TestConstantIntegration:
             assert str_const.value == "hello"
 
     def test_float_precision_from_environment(self):
-        with mock.patch.dict(os.environ, {"FLOAT_PRECISION": "3.141592653589793"}):
+        with patched_env({"FLOAT_PRECISION": "3.141592653589793"}):
             const = Constant(0.0, "float_precision", env_var="FLOAT_PRECISION")
             assert const.value == 3.141592653589793
             assert str(const.value) == "3.141592653589793"
 
     def test_negative_numbers_from_environment(self):
-        with mock.patch.dict(os.environ, {"NEGATIVE_INT": "-42", "NEGATIVE_FLOAT": "-3.14"}):
+        with patched_env({"NEGATIVE_INT": "-42", "NEGATIVE_FLOAT": "-3.14"}):
             int_const = Constant(0, "negative_int", env_var="NEGATIVE_INT")
             float_const = Constant(0.0, "negative_float", env_var="NEGATIVE_FLOAT")
 
@@ -631,12 +653,12 @@ class TestConstantIntegration:
             assert float_const.value == -3.14
 
     def test_list_with_empty_items(self):
-        with mock.patch.dict(os.environ, {"LIST_EMPTY_ITEMS": "a,,b,,c"}):
+        with patched_env({"LIST_EMPTY_ITEMS": "a,,b,,c"}):
             const = Constant([], "list_empty_items", env_var="LIST_EMPTY_ITEMS")
             assert const.value == ["a", "", "b", "", "c"]
 
     def test_zero_values_from_environment(self):
-        with mock.patch.dict(os.environ, {"ZERO_INT": "0", "ZERO_FLOAT": "0.0"}):
+        with patched_env({"ZERO_INT": "0", "ZERO_FLOAT": "0.0"}):
             int_const = Constant(99, "zero_int", env_var="ZERO_INT")
             float_const = Constant(99.9, "zero_float", env_var="ZERO_FLOAT")
 
@@ -1,13 +1,16 @@
 import json
 import os
 import tempfile
+import threading
 from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 import numpy as np
 import pytest
+import sqlean
 
 from embedder.store.sqlite.sql import (
+    STATEMENT_CACHE_SIZE,
     SqliteConnInstance,
     SqliteEmbeddingRow,
     SqliteEmbeddingRowWithDistance,
@@ -15,8 +18,9 @@ from embedder.store.sqlite.sql import (
     create_collection,
     delete_collection,
     delete_collection_by_name,
+    delete_collections,
     format_embedding_for_sqlite,
-    format_sources_for_sqlite,
+    format_sources_clause_for_sqlite,
     get_collection_sources,
     get_collections_details,
     get_collections_details_by_name,
@@ -24,8 +28,12 @@ from embedder.store.sqlite.sql import (
     get_sqlite_connection,
     initialize_sqlite_tables,
     insert_embeddings,
+    insert_embeddings_soa,
+    int8_scale,
+    quantize_embeddings_int8,
     search_embeddings,
     search_relevant_collections,
+    transaction,
     update_collection_state,
 )
 from embedder.store.store import CollectionState, RelevantCollection
@@ -44,6 +52,19 @@ class TestSqliteConnection:
                 # Check WAL mode is enabled
                 cursor = conn.execute("PRAGMA journal_mode")
                 assert cursor.fetchone()[0] == "wal"
+                assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+                assert conn.execute("PRAGMA cache_size").fetchone()[0] == -64000
+                conn.close()
+
+    def test_get_sqlite_connection_statement_cache(self):
+        """Test that connections are opened with the enlarged statement cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "test.db")
+            with patch("embedder.store.sqlite.sql.SQLITE_DB_LOCATION", MagicMock(value=db_path)), patch(
+                "embedder.store.sqlite.sql.sqlean.connect", wraps=sqlean.connect
+            ) as mock_connect:
+                conn = get_sqlite_connection()
+                assert mock_connect.call_args.kwargs["cached_statements"] == STATEMENT_CACHE_SIZE
                 conn.close()
 
     def test_get_sqlite_connection_creates_directory(self):
@@ -68,7 +89,7 @@ class TestSqliteConnection:
         mock_get_conn.return_value = mock_conn
 
         # Clear any existing connection
-        SqliteConnInstance._connection = None
+        SqliteConnInstance._local.connection = None
 
         instance = SqliteConnInstance()
         # Connection should not be created yet
@@ -84,6 +105,24 @@ class TestSqliteConnection:
         mock_get_conn.assert_called_once()  # Still only called once
         assert conn2 == mock_conn
 
+    @patch("embedder.store.sqlite.sql.get_sqlite_connection")
+    def test_sqlite_conn_instance_connection_per_thread(self, mock_get_conn):
+        """Test that each thread gets its own connection."""
+        mock_get_conn.side_effect = lambda: MagicMock()
+        SqliteConnInstance._local.connection = None
+
+        main_conn = SqliteConnInstance().conn
+        thread_conns = []
+        thread = threading.Thread(target=lambda: thread_conns.append(SqliteConnInstance().conn))
+        thread.start()
+        thread.join()
+
+        assert SqliteConnInstance().conn is main_conn
+        assert len(thread_conns) == 1
+        assert thread_conns[0] is not main_conn
+        assert mock_get_conn.call_count == 2
+        SqliteConnInstance._local.connection = None
+
 
 class TestSqliteEmbeddingRow:
     """Test suite for SqliteEmbeddingRow dataclass."""
@@ -104,12 +143,7 @@ class TestSqliteEmbeddingRow:
         assert result["id"] == "test-id"
         assert result["collection"] == "test-collection"
         assert result["text"] == "test text"
-        # Parse and compare embeddings with tolerance due to float32 precision
-        embedding_result = json.loads(result["embedding"])
-        expected_embedding = [0.1, 0.2, 0.3]
-        assert len(embedding_result) == len(expected_embedding)
-        for i in range(len(embedding_result)):
-            assert abs(embedding_result[i] - expected_embedding[i]) < 1e-5
+        np.testing.assert_array_equal(np.frombuffer(result["embedding"], dtype=np.float32), embedding)
         assert result["metadata"] == json.dumps(metadata)
 
     def test_to_row_dict_no_metadata(self):
@@ -132,7 +166,7 @@ class TestSqliteEmbeddingRow:
             "id": "test-id",
             "collection": "test-collection",
             "text": "test text",
-            "embedding": "[0.1, 0.2, 0.3]",
+            "embedding": np.array([0.1, 0.2, 0.3], dtype=np.float32).tobytes(),
             "metadata": '{"key": "value"}',
         }
 
@@ -149,7 +183,7 @@ class TestSqliteEmbeddingRow:
             "id": "test-id",
             "collection": "test-collection",
             "text": "test text",
-            "embedding": "[0.5]",
+            "embedding": np.array([0.5], dtype=np.float32).tobytes(),
             "metadata": None,
         }
 
@@ -166,7 +200,7 @@ class TestSqliteEmbeddingRowWithDistance:
             "id": "test-id",
             "collection": "test-collection",
             "text": "test text",
-            "embedding": "[0.1, 0.2]",
+            "embedding": np.array([0.1, 0.2], dtype=np.float32).tobytes(),
             "metadata": '{"key": "value"}',
             "distance": 0.75,
         }
@@ -209,36 +243,54 @@ class TestFormattingFunctions:
         """Test formatting numpy array for SQLite storage."""
         embedding = np.array([0.1, 0.2, 0.3], dtype=np.float32)
         result = format_embedding_for_sqlite(embedding)
-        # Parse and compare with tolerance due to float32 precision
-        parsed_result = json.loads(result)
-        expected = [0.1, 0.2, 0.3]
-        assert len(parsed_result) == len(expected)
-        for i in range(len(parsed_result)):
-            assert abs(parsed_result[i] - expected[i]) < 1e-5
+        assert isinstance(result, bytes)
+        np.testing.assert_array_equal(np.frombuffer(result, dtype=np.float32), embedding)
+
+    def test_format_embedding_for_sqlite_casts_to_float32(self):
+        """Test that non float32 embeddings are stored as float32."""
+        embedding = np.array([0.1, 0.2, 0.3], dtype=np.float64)
+        result = format_embedding_for_sqlite(embedding)
+        assert len(result) == 3 * 4
+        np.testing.assert_array_almost_equal(np.frombuffer(result, dtype=np.float32), embedding)
 
     def test_format_embedding_for_sqlite_single_value(self):
         """Test formatting single value embedding."""
         embedding = np.array([0.5], dtype=np.float32)
         result = format_embedding_for_sqlite(embedding)
-        assert result == "[0.500000000000]"
-
-    def test_format_sources_for_sqlite(self):
-        """Test formatting source list for SQLite query."""
-        sources = ["source1", "source2", "source3"]
-        result = format_sources_for_sqlite(sources)
-        assert result == "'source1','source2','source3'"
+        assert result == np.float32(0.5).tobytes()
+
+    def test_quantize_embeddings_int8(self):
+        """Test that embeddings are normalized and rounded onto the int8 range."""
+        np.testing.assert_array_equal(quantize_embeddings_int8(np.array([3.0, 4.0, 0.0])), [76, 102, 0])
+        np.testing.assert_array_equal(quantize_embeddings_int8(np.array([[0.6, 0.8, 0.0]])), [[76, 102, 0]])
+        np.testing.assert_array_equal(quantize_embeddings_int8(np.zeros(3)), [0, 0, 0])
+
+    def test_quantize_embeddings_int8_scales_high_dimensions(self):
+        """Test that components of high dimensional unit vectors use most of the int8 range."""
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(100, 384))
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        quantized = quantize_embeddings_int8(embeddings)
+        assert quantized.dtype == np.int8
+        assert np.abs(quantized).max() == 127
+        # Only components beyond INT8_CLIP_STDDEVS standard deviations are clipped
+        clipped = np.abs(quantized) == 127
+        assert clipped.mean() < 1e-3
+        np.testing.assert_allclose(
+            quantized[~clipped] / int8_scale(384), embeddings[~clipped], atol=0.5 / int8_scale(384)
+        )
 
-    def test_format_sources_for_sqlite_single(self):
-        """Test formatting single source."""
-        sources = ["source1"]
-        result = format_sources_for_sqlite(sources)
-        assert result == "'source1'"
+    def test_format_sources_clause_for_sqlite(self):
+        """Test that sources are bound as a single JSON array parameter."""
+        sources = ["source1", "it's", "source3"]
+        clause, params = format_sources_clause_for_sqlite("collection", sources)
+        assert clause == "AND collection IN (SELECT value FROM json_each(?))"
+        assert params == (json.dumps(sources),)
 
-    def test_format_sources_for_sqlite_empty(self):
-        """Test formatting empty source list."""
-        sources = []
-        result = format_sources_for_sqlite(sources)
-        assert result == ""
+    def test_format_sources_clause_for_sqlite_empty(self):
+        """Test that no sources means no filter."""
+        assert format_sources_clause_for_sqlite("collection", []) == ("", ())
+        assert format_sources_clause_for_sqlite("collection", None) == ("", ())
 
 
 class TestDatabaseOperations:
@@ -267,6 +319,11 @@ class TestDatabaseOperations:
         cursor = test_db.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='collections'")
         assert cursor.fetchone() is not None
 
+        # Check collections lookups are indexed
+        cursor = test_db.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='collections'")
+        indexes = {row["name"] for row in cursor.fetchall()}
+        assert {"idx_collections_source_path", "idx_collections_source_name"} <= indexes
+
     def test_create_and_get_collection(self, test_db):
         """Test creating and retrieving collections."""
         # Create collection
@@ -283,6 +340,52 @@ class TestDatabaseOperations:
         assert details[0].source_name == "Test Name"
         assert details[0].status == CollectionState.PROCESSING
 
+    @patch("embedder.store.sqlite.sql.EMBEDDING_SIZE", MagicMock(value=3))
+    def test_get_collections_details_multiple_sources(self, test_db):
+        """Test collection details with vector counts for several sources."""
+        create_collection(test_db, "source1", "Name1", "text", CollectionState.COMPLETED)
+        create_collection(test_db, "source2", "Name2", "text", CollectionState.PROCESSING)
+        create_collection(test_db, "source3", "Name3", "text", CollectionState.PROCESSING)
+        insert_embeddings(
+            test_db,
+            [
+                SqliteEmbeddingRow(
+                    id=str(uuid4()),
+                    collection="source1",
+                    text=f"text {i}",
+                    embedding=np.array([0.1, 0.2, 0.3], dtype=np.float32),
+                    metadata=None,
+                )
+                for i in range(2)
+            ],
+        )
+
+        details = {d.source_path: d for d in get_collections_details(test_db, ["source1", "source2"])}
+        assert set(details) == {"source1", "source2"}
+        assert details["source1"].vector_count == 2
+        assert details["source2"].vector_count == 0
+        assert details["source1"].dimension == 3
+
+        assert len(get_collections_details(test_db)) == 3
+        assert get_collections_details(test_db, []) == []
+
+    def test_transaction_commits_and_rolls_back(self, test_db):
+        """Test that writes inside transaction are committed together or not at all."""
+        test_db.commit()
+        with transaction(test_db):
+            create_collection(test_db, "source1", "Name1", "text", CollectionState.PROCESSING)
+            update_collection_state(test_db, "source1", CollectionState.COMPLETED)
+        assert not test_db.in_transaction
+
+        with pytest.raises(RuntimeError):
+            with transaction(test_db):
+                create_collection(test_db, "source2", "Name2", "text", CollectionState.PROCESSING)
+                raise RuntimeError("boom")
+        assert not test_db.in_transaction
+
+        assert get_collection_sources(test_db) == ["source1"]
+        assert get_collections_details(test_db, ["source1"])[0].status == CollectionState.COMPLETED
+
     def test_update_collection_state(self, test_db):
         """Test updating collection state."""
         create_collection(test_db, "test-source", "Test Name", "text", CollectionState.PROCESSING)
@@ -321,6 +424,31 @@ class TestDatabaseOperations:
         cursor = test_db.execute("SELECT COUNT(*) FROM embeddings WHERE collection = ?", ("test-source",))
         assert cursor.fetchone()[0] == 0
 
+    def test_delete_collections(self, test_db):
+        """Test deleting several collections at once."""
+        for source in ("source1", "source2", "source3"):
+            create_collection(test_db, source, source, "text", CollectionState.PROCESSING)
+            insert_embeddings(
+                test_db,
+                [
+                    SqliteEmbeddingRow(
+                        id=str(uuid4()),
+                        collection=source,
+                        text="test text",
+                        embedding=np.array([0.1, 0.2, 0.3], dtype=np.float32),
+                        metadata=None,
+                    )
+                ],
+            )
+
+        deleted = delete_collections(test_db, ["source1", "source3", "missing"])
+
+        assert sorted(deleted) == ["source1", "source3"]
+        assert get_collection_sources(test_db) == ["source2"]
+        cursor = test_db.execute("SELECT collection FROM embeddings")
+        assert [row[0] for row in cursor] == ["source2"]
+        assert delete_collections(test_db, []) == []
+
     def test_delete_collection_by_name(self, test_db):
         """Test deleting collections by name."""
         # Create multiple collections with same name
@@ -365,6 +493,7 @@ class TestDatabaseOperations:
         assert result.id == embedding_id
         assert result.text == "test text"
         assert result.metadata == {"key": "value"}
+        np.testing.assert_array_equal(result.embedding, np.array([0.1, 0.2, 0.3], dtype=np.float32))
 
         # Get with specific collection
         result = get_embedding_row_by_id(test_db, embedding_id, "test-source")
@@ -374,6 +503,21 @@ class TestDatabaseOperations:
         result = get_embedding_row_by_id(test_db, embedding_id, "wrong-source")
         assert result is None
 
+    def test_insert_embeddings_soa(self, test_db):
+        """Test inserting embeddings given as columns."""
+        create_collection(test_db, "test-source", "Test Name", "text", CollectionState.PROCESSING)
+        embeddings = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], dtype=np.float64)
+
+        insert_embeddings_soa(test_db, ["id-1", "id-2"], "test-source", ["one", "two"], embeddings, [{"k": 1}, None])
+
+        first = get_embedding_row_by_id(test_db, "id-1", "test-source")
+        second = get_embedding_row_by_id(test_db, "id-2", "test-source")
+        assert first is not None and second is not None
+        assert (first.text, first.metadata) == ("one", {"k": 1})
+        assert (second.text, second.metadata) == ("two", None)
+        np.testing.assert_array_equal(first.embedding, embeddings[0].astype(np.float32))
+        np.testing.assert_array_equal(second.embedding, embeddings[1].astype(np.float32))
+
     def test_get_collections_details_by_name(self, test_db):
         """Test getting collection details by name."""
         # Create collections
@@ -421,3 +565,121 @@ class TestDatabaseOperations:
         except Exception:
             # Expected in test environment without vec0 extension
             pass
+
+    def test_search_relevant_collections_distances(self, test_db):
+        """Test that collection distances computed on int8 vectors approximate float distances."""
+        create_collection(test_db, "near", "Near", "text", CollectionState.COMPLETED)
+        create_collection(test_db, "far", "Far", "text", CollectionState.COMPLETED)
+        embeddings = {
+            "near": np.array([0.6, 0.8, 0.0], dtype=np.float32),
+            "far": np.array([0.0, -0.6, 0.8], dtype=np.float32),
+        }
+        insert_embeddings(
+            test_db,
+            [
+                SqliteEmbeddingRow(id=str(uuid4()), collection=name, text=name, embedding=embedding, metadata=None)
+                for name, embedding in embeddings.items()
+            ],
+        )
+
+        query = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+        results = {row.collection: row for row in search_relevant_collections(test_db, query, k=5)}
+        assert set(results) == {"near", "far"}
+        for name, embedding in embeddings.items():
+            assert results[name].count == 1
+            assert results[name].min_distance == pytest.approx(np.linalg.norm(query - embedding), abs=0.02)
+
+        results = search_relevant_collections(test_db, query, k=5, distance_threshold=1.0)
+        assert [row.collection for row in results] == ["near"]
+
+        # Collections are ranked by their closest embedding before the limit applies
+        results = search_relevant_collections(test_db, query, k=1)
+        assert [row.collection for row in results] == ["near"]
+
+        # Source filters
+        results = search_relevant_collections(test_db, query, k=5, sources=["far"])
+        assert [row.collection for row in results] == ["far"]
+        rows = search_embeddings(test_db, query, k=5, sources=["near"])
+        assert [row.text for row in rows] == ["near"]
+        rows = search_embeddings(test_db, query, k=5, sources=["near", "far"])
+        assert [row.text for row in rows] == ["near", "far"]
+
+    def test_search_embeddings_matches_exact_ranking(self, test_db):
+        """Test that reranked search returns the exact nearest rows and float distances."""
+        create_collection(test_db, "test-source", "Test Name", "text", CollectionState.COMPLETED)
+        rng = np.random.default_rng(0)
+        embeddings = rng.normal(size=(50, 3)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        ids = [f"id-{i}" for i in range(len(embeddings))]
+        insert_embeddings_soa(test_db, ids, "test-source", ids, embeddings, [None] * len(ids))
+
+        query = embeddings[0]
+        rows = search_embeddings(test_db, query, k=5)
+
+        distances = np.linalg.norm(embeddings - query, axis=1)
+        expected = np.argsort(distances)[:5]
+        assert [row.id for row in rows] == [ids[i] for i in expected]
+        np.testing.assert_allclose([row.distance for row in rows], distances[expected], atol=1e-6)
+
+    def test_int8_ranking_matches_float_ranking(self, test_db):
+        """Test that ranking normalized embeddings on the int8 vectors agrees with float ranking."""
+        test_db.execute("DROP TABLE embeddings")
+        initialize_sqlite_tables(test_db, 384)
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(5, 384))
+        collections = np.repeat([f"collection-{i}" for i in range(len(centers))], 40)
+        embeddings = np.repeat(centers, 40, axis=0) + rng.normal(size=(len(collections), 384)) * 1.2
+        embeddings = (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)).astype(np.float32)
+        ids = [f"id-{i}" for i in range(len(embeddings))]
+        for collection in np.unique(collections):
+            mask = collections == collection
+            rows = [row_id for row_id, selected in zip(ids, mask) if selected]
+            insert_embeddings_soa(test_db, rows, collection, rows, embeddings[mask], [None] * len(rows))
+
+        for i in rng.integers(len(embeddings), size=20):
+            query = embeddings[i] + rng.normal(size=384).astype(np.float32) * 0.03
+            query /= np.linalg.norm(query)
+            distances = np.linalg.norm(embeddings - query, axis=1)
+
+            rows = search_embeddings(test_db, query, k=5)
+            assert [row.id for row in rows] == [ids[j] for j in np.argsort(distances)[:5]]
+
+            min_distances = {
+                collection: distances[collections == collection].min() for collection in np.unique(collections)
+            }
+            results = search_relevant_collections(test_db, query, k=5)
+            assert results[0].collection == min(min_distances, key=min_distances.__getitem__)
+            for row in results:
+                assert row.min_distance == pytest.approx(min_distances[row.collection], abs=0.01)
+
+    def test_initialize_sqlite_tables_migrates_legacy_embeddings(self, test_db):
+        """Test that tables created without int8 embeddings are rebuilt with them."""
+        test_db.execute("DROP TABLE embeddings")
+        test_db.execute(
+            """
+            CREATE VIRTUAL TABLE embeddings USING vec0(
+                id TEXT PRIMARY KEY,
+                collection TEXT NOT NULL,
+                text TEXT NOT NULL,
+                embedding FLOAT[3],
+                metadata TEXT
+            )
+            """
+        )
+        # Stored before the embedder normalized its output
+        embedding = np.array([3.0, 4.0, 0.0], dtype=np.float32)
+        test_db.execute(
+            "INSERT INTO embeddings (id, collection, text, embedding, metadata) VALUES (?, ?, ?, ?, ?)",
+            ("legacy-id", "legacy-source", "legacy text", embedding.tobytes(), "{}"),
+        )
+        test_db.commit()
+
+        initialize_sqlite_tables(test_db, 3)
+
+        result = get_embedding_row_by_id(test_db, "legacy-id")
+        assert result is not None
+        assert result.text == "legacy text"
+        np.testing.assert_array_equal(result.embedding, embedding)
+        results = search_relevant_collections(test_db, np.array([0.6, 0.8, 0.0], dtype=np.float32), k=5)
+        assert [row.collection for row in results] == ["legacy-source"]
+        assert results[0].min_distance == pytest.approx(0.0, abs=0.01)
@@ -1,3 +1,4 @@
+import uuid
 from unittest.mock import MagicMock, patch
 
 import numpy as np
@@ -27,7 +28,7 @@ class TestSqliteEmbeddingStore:
         store = SqliteEmbeddingStore("test-collection")
         assert store.name() == "test-collection"
 
-    @patch("embedder.store.sqlite.sqlite.insert_embeddings")
+    @patch("embedder.store.sqlite.sqlite.insert_embeddings_soa")
     @patch("embedder.store.sqlite.sqlite.SqliteConnInstance")
     def test_add_batch(self, mock_conn_instance, mock_insert_embeddings):
         """Test adding a batch of text inputs."""
@@ -55,16 +56,16 @@ class TestSqliteEmbeddingStore:
         assert len(result_ids) == 3
         mock_insert_embeddings.assert_called_once()
 
-        # Check the embeddings passed to insert
-        call_args = mock_insert_embeddings.call_args[0]
-        embeddings = call_args[1]
-        assert len(embeddings) == 3
-        assert all(isinstance(e, SqliteEmbeddingRow) for e in embeddings)
-        assert embeddings[0].text == "text1"
-        assert embeddings[1].text == "text2"
-        assert embeddings[2].text == "text3"
+        # Check the columns passed to insert
+        conn, ids, collection, texts, embeddings, metadatas = mock_insert_embeddings.call_args[0]
+        assert conn is mock_conn
+        assert ids == result_ids
+        assert collection == "test-collection"
+        assert texts == ["text1", "text2", "text3"]
+        np.testing.assert_array_equal(embeddings, np.stack([ti._vec for ti in text_inputs]))
+        assert metadatas == [{"key1": "value1"}, {"key2": "value2"}, {}]
 
-    @patch("embedder.store.sqlite.sqlite.insert_embeddings")
+    @patch("embedder.store.sqlite.sqlite.insert_embeddings_soa")
     @patch("embedder.store.sqlite.sqlite.SqliteConnInstance")
     def test_add_batch_with_custom_ids(self, mock_conn_instance, mock_insert_embeddings):
         """Test adding a batch with custom IDs in metadata."""
@@ -82,9 +83,30 @@ class TestSqliteEmbeddingStore:
 
         # Verify custom ID was used
         assert result_ids[0] == custom_id
-        call_args = mock_insert_embeddings.call_args[0]
-        embeddings = call_args[1]
-        assert embeddings[0].id == custom_id
+        ids = mock_insert_embeddings.call_args[0][1]
+        assert ids == [custom_id]
+
+    @patch("embedder.store.sqlite.sqlite.insert_embeddings_soa")
+    @patch("embedder.store.sqlite.sqlite.SqliteConnInstance")
+    def test_add_batch_generates_missing_ids(self, mock_conn_instance, mock_insert_embeddings):
+        """Test that only inputs without an ID get a fresh, unique UUID4."""
+        store = SqliteEmbeddingStore("test-collection")
+
+        text_inputs = [
+            TextInput(text="text1", metadata={}),
+            TextInput(text="text2", metadata={"id": "custom-id"}),
+            TextInput(text="text3", metadata={}),
+        ]
+        for ti in text_inputs:
+            ti._vec = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+
+        result_ids = store.add_batch(text_inputs)
+
+        assert result_ids[1] == "custom-id"
+        assert result_ids[0] != result_ids[2]
+        for generated in (result_ids[0], result_ids[2]):
+            assert str(uuid.UUID(generated)) == generated
+            assert uuid.UUID(generated).version == 4
 
     @patch("embedder.store.sqlite.sqlite.get_collections_details")
     @patch("embedder.store.sqlite.sqlite.SqliteConnInstance")
@@ -139,6 +161,28 @@ class TestSqliteDataSourceMap:
         assert ds_map.exists("source2") is True
         assert ds_map.exists("source4") is False
 
+    @patch("embedder.store.sqlite.sqlite.create_collection")
+    @patch("embedder.store.sqlite.sqlite.get_collection_sources")
+    @patch("embedder.store.sqlite.sqlite.SqliteConnInstance")
+    def test_sources_are_cached_until_create(self, mock_conn_instance, mock_get_sources, mock_create_collection):
+        """Test that lookups reuse the cached sources until a collection is created."""
+        mock_conn_instance.return_value.conn = MagicMock()
+        mock_get_sources.return_value = ["source1", "source2"]
+
+        ds_map = SqliteDataSourceMap()
+        assert ds_map.exists("source1") is True
+        assert "source2" in ds_map
+        assert len(ds_map) == 2
+        assert list(ds_map) == ["source1", "source2"]
+        assert ds_map.list_sources() == ["source1", "source2"]
+        mock_get_sources.assert_called_once()
+
+        ds_map.create("source3", "text")
+        mock_get_sources.return_value = ["source1", "source2", "source3"]
+        assert ds_map.exists("source3") is True
+        # Once for the existence check in create, once to reload the cache
+        assert mock_get_sources.call_count == 3
+
     @patch("embedder.store.sqlite.sqlite.get_collection_sources")
     @patch("embedder.store.sqlite.sqlite.SqliteConnInstance")
     def test_get_existing_source(self, mock_conn_instance, mock_get_sources):
@@ -228,6 +272,20 @@ class TestSqliteDataSourceMap:
 
         assert result is False
 
+    @patch("embedder.store.sqlite.sqlite.delete_collections")
+    @patch("embedder.store.sqlite.sqlite.SqliteConnInstance")
+    def test_delete_many(self, mock_conn_instance, mock_delete_collections):
+        """Test deleting several sources in one call."""
+        mock_conn = MagicMock()
+        mock_conn_instance.return_value.conn = mock_conn
+        mock_delete_collections.return_value = ["source1"]
+
+        ds_map = SqliteDataSourceMap()
+        result = ds_map.delete_many(["source1", "missing"])
+
+        assert result == ["source1"]
+        mock_delete_collections.assert_called_once_with(mock_conn, ["source1", "missing"])
+
     @patch("embedder.store.sqlite.sqlite.delete_collection_by_name")
     @patch("embedder.store.sqlite.sqlite.SqliteConnInstance")
     def test_delete_by_name(self, mock_conn_instance, mock_delete_by_name):
@@ -326,6 +384,13 @@ class TestSqliteDataSourceMap:
         assert stats["source1"].vector_count == 100
         assert "source2" in stats
         assert stats["source2"].vector_count == 50
+        assert stats["source1"].to_dict() == {
+            "source_name": "name1",
+            "source_path": "source1",
+            "status": CollectionState.COMPLETED,
+            "vector_count": 100,
+            "dimension": 768,
+        }
 
     @patch("embedder.store.sqlite.sqlite.get_collections_details")
     @patch("embedder.store.sqlite.sqlite.SqliteConnInstance")
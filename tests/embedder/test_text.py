@@ -1,5 +1,17 @@
-from embedder.text import TextInput
+import numpy as np
+
+from embedder.text import TextBatch, TextInput
 
 
 def test_text_input_str():
     assert str(TextInput("yo", {"id": 1})) == "yo"
+
+
+def test_text_batch_set_vectors_shares_one_float32_matrix():
+    batch = TextBatch([TextInput("a", {}), TextInput("bb", {})])
+    batch.set_vectors(np.array([[1, 2], [3, 4]]))
+
+    first, second = (text_input._vec for text_input in batch.inputs)
+    assert first.dtype == np.float32
+    np.testing.assert_array_equal(second, [3.0, 4.0])
+    assert first.base is second.base
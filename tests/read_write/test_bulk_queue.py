@@ -1,6 +1,14 @@
+import threading
+import time
+from datetime import timedelta
+from queue import Full
+from typing import List
+from unittest.mock import MagicMock, patch
+
 import numpy as np
+import pytest
 
-from embedder.read_write.bulk_queue import BulkQueueReadWriter
+from embedder.read_write.bulk_queue import BulkQueue, BulkQueueReadWriter
 from embedder.text import TextBatch
 from tests.conftest import text_input_factory
 
@@ -81,3 +89,99 @@ def test_batch_size_limit():
     # Second read should return remaining items
     batch2 = reader.read()
     assert len(batch2) == 2
+
+
+def test_put_many_raises_when_queue_stays_full():
+    """Test that put_many gives up after the configured number of retries."""
+    queue: BulkQueue[int] = BulkQueue(maxsize=2)
+    with (
+        patch("embedder.read_write.bulk_queue.BULK_QUEUE_FULL_RETRY_COUNT", MagicMock(value=2)),
+        patch("embedder.read_write.bulk_queue.BULK_QUEUE_FULL_SLEEP_TIME", MagicMock(value=0.001)),
+    ):
+        with pytest.raises(Full):
+            queue.put_many([1, 2, 3])
+
+    # Items that fit before the queue filled up are kept, in order
+    assert queue.get_many(10) == [1, 2]
+
+
+def test_put_many_waits_for_consumer_to_free_space():
+    """Test that put_many completes once a concurrent consumer drains the queue."""
+    queue: BulkQueue[int] = BulkQueue(maxsize=2)
+    consumed: List[int] = []
+
+    def consume():
+        while len(consumed) < 5:
+            consumed.extend(queue.get_many(2))
+            time.sleep(0.001)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    queue.put_many([0, 1, 2, 3, 4])
+    consumer.join(timeout=5)
+
+    assert consumed == [0, 1, 2, 3, 4]
+
+
+def test_task_done_many():
+    """Test that task_done_many settles unfinished tasks in one call."""
+    queue: BulkQueue[int] = BulkQueue(maxsize=10)
+    queue.put_many([1, 2, 3])
+    assert queue.get_many(3) == [1, 2, 3]
+
+    queue.task_done_many(3)
+    assert queue._queue.unfinished_tasks == 0
+
+    with pytest.raises(ValueError):
+        queue.task_done_many(1)
+
+
+def test_wake_consumer_only_on_empty_edge():
+    """Test that producers wake the consumer only when it may be idle."""
+    wake = MagicMock()
+    queue: BulkQueue[int] = BulkQueue(maxsize=10, wake_consumer_function=wake)
+
+    queue.put_nowait(1)
+    queue.put_many([2, 3])
+    queue.put_nowait(4)
+    assert wake.call_count == 1
+
+    # Draining the queue and finding it empty means the consumer may go to sleep
+    assert queue.get_many(10) == [1, 2, 3, 4]
+    assert queue.get_many(10) == []
+    queue.put_nowait(5)
+    assert wake.call_count == 2
+
+    # A consumer that stopped while items were still queued is woken on the next put
+    queue.mark_consumer_asleep()
+    queue.put_nowait(6)
+    assert wake.call_count == 3
+
+
+def test_read_backs_off_on_empty_queue():
+    """Test that empty reads wait longer each time and a successful read resets the wait."""
+    reader = BulkQueueReadWriter()
+    reader._sleep_time = timedelta(milliseconds=1)
+
+    assert len(reader.read()) == 0
+    assert reader._read_backoff == timedelta(microseconds=200)
+    for _ in range(5):
+        reader.read()
+    assert reader._read_backoff == timedelta(milliseconds=1)
+
+    reader._read_queue.put_nowait(text_input_factory(1))
+    assert len(reader.read()) == 1
+    assert reader._read_backoff == timedelta(microseconds=100)
+
+
+def test_wait_not_empty_wakes_on_put():
+    """Test that a waiting reader is woken as soon as an item is put."""
+    queue: BulkQueue[int] = BulkQueue(maxsize=10)
+    assert queue.wait_not_empty(0.001) is False
+
+    timer = threading.Timer(0.01, queue.put_nowait, args=(1,))
+    timer.start()
+    start = time.monotonic()
+    assert queue.wait_not_empty(5) is True
+    assert time.monotonic() - start < 1
+    timer.join()
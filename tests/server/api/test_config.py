@@ -6,6 +6,7 @@ import pytest
 
 from common.config.constant import Constant
 from server.api.config import (
+    _check_uppercase_names,
     all_configs,
     edit_config,
     editable_name_to_config_map,
@@ -87,6 +88,14 @@ class TestValidateConfigType:
             validate_config_type(constant, "invalid json")
         assert "Invalid config value or type" in str(exc_info.value)
 
+    def test_validate_config_type_unsupported(self):
+        """Test that constants of a type without a converter only accept matching values."""
+        constant = Constant(("a", "b"))  # tuple default value
+        assert validate_config_type(constant, ("c",)) == ("c",)
+        with pytest.raises(MCPError) as exc_info:
+            validate_config_type(constant, "c")
+        assert "Invalid config value or type" in str(exc_info.value)
+
 
 class TestFormatConfig:
     """Test suite for format_config function."""
@@ -203,6 +212,25 @@ class TestAllConfigs:
         assert result["CONFIG2"]["value"] == 123
         assert result["CONFIG3"]["value"] is True
 
+    @patch.dict(editable_name_to_config_map, clear=True)
+    @patch.dict(frozen_config_map, clear=True)
+    def test_all_configs_reflects_updated_values(self):
+        """Test that all_configs picks up values changed after a previous call."""
+        editable_const = Constant(0)  # int default value
+        editable_name_to_config_map["CACHED_EDITABLE"] = editable_const
+        frozen_const = Constant("default")  # str default value
+        frozen_config_map["CACHED_FROZEN"] = frozen_const
+
+        first = all_configs()
+        assert all_configs() == first
+
+        edit_config("CACHED_EDITABLE", "7")
+        frozen_const.set("changed")
+
+        result = all_configs()
+        assert result["CACHED_EDITABLE"] == {"value": 7, "type": "int", "frozen": False}
+        assert result["CACHED_FROZEN"] == {"value": "changed", "type": "str", "frozen": True}
+
 
 class TestIntegration:
     """Integration tests for config module."""
@@ -219,6 +247,17 @@ class TestIntegration:
         assert "EMBEDDER_IDLE_TIMEOUT" in frozen_config_map
         assert "SQLITE_DB_LOCATION" in frozen_config_map
 
+    def test_config_names_uppercase(self):
+        """Test that config names are uppercase so edit_config and all_configs can use them as is."""
+        assert all(name.isupper() for name in editable_name_to_config_map)
+        assert all(name.isupper() for name in frozen_config_map)
+
+    def test_check_uppercase_names(self):
+        """Test that lowercase config names are rejected with a ValueError."""
+        _check_uppercase_names({"SEARCH_RESULT_LIMIT": Constant(10)}, "editable")
+        with pytest.raises(ValueError, match="editable config names must be uppercase: search_result_limit"):
+            _check_uppercase_names({"search_result_limit": Constant(10)}, "editable")
+
     def test_config_type_consistency(self):
         """Test that config types match their constant types."""
         for name, constant in editable_name_to_config_map.items():
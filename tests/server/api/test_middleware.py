@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from server.api.middleware import MCPErrorMiddleware
+from server.error import MCPError
+
+pytestmark = pytest.mark.anyio
+
+
+async def _call(app) -> list:
+    """Run the middleware-wrapped app for a single HTTP request and collect the sent messages."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/manual/test", "headers": []}
+    await MCPErrorMiddleware(app)(scope, receive, send)
+    return messages
+
+
+class TestMCPErrorMiddleware:
+    """Test suite for MCPErrorMiddleware."""
+
+    async def test_passes_through_response(self):
+        """Test that responses from the wrapped app are forwarded unchanged."""
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        messages = await _call(app)
+        assert messages[0]["status"] == 204
+
+    async def test_mcp_error_response(self):
+        """Test that MCPError is turned into a JSON error response with its code."""
+
+        async def app(scope, receive, send):
+            raise MCPError("bad config", 400)
+
+        messages = await _call(app)
+        assert messages[0]["status"] == 400
+        assert json.loads(messages[1]["body"]) == {"status": "error", "error": "bad config"}
+
+    async def test_unexpected_error_response(self):
+        """Test that other exceptions become a generic 500 response."""
+
+        async def app(scope, receive, send):
+            raise RuntimeError("boom")
+
+        messages = await _call(app)
+        assert messages[0]["status"] == 500
+        assert json.loads(messages[1]["body"])["status"] == "error"
+
+    async def test_error_after_response_started_is_raised(self):
+        """Test that errors after the response started are re-raised instead of sending a second response."""
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await _call(app)
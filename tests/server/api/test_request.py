@@ -0,0 +1,32 @@
+import json
+
+import pytest
+from starlette.requests import Request
+
+from server.api.request import read_json
+
+pytestmark = pytest.mark.anyio
+
+
+def _request(body: bytes) -> Request:
+    """Build a POST request whose body is sent in a single message."""
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/manual/test", "headers": []}
+    return Request(scope, receive)
+
+
+class TestReadJson:
+    """Test suite for read_json."""
+
+    async def test_decodes_body(self):
+        """Test that the request body is decoded as JSON."""
+        body = {"query": "héllo", "limit": 5, "sources": ["a", "b"], "nested": {"x": 1.5}}
+        assert await read_json(_request(json.dumps(body).encode("utf-8"))) == body
+
+    async def test_invalid_body_raises(self):
+        """Test that an invalid body raises the stdlib JSONDecodeError."""
+        with pytest.raises(json.JSONDecodeError):
+            await read_json(_request(b"{not json"))
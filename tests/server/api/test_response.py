@@ -0,0 +1,60 @@
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from server.api.response import JSONResponse, json_serializer
+
+
+class _Timestamp(datetime):
+    """datetime subclass, like the ones third party libraries return."""
+
+
+class _Duration(timedelta):
+    """timedelta subclass."""
+
+
+class TestJSONResponse:
+    """Test suite for JSONResponse rendering."""
+
+    def test_render_compact_json(self):
+        """Test that content is rendered as compact utf-8 JSON."""
+        response = JSONResponse({"status": "ok", "data": [1, 2.5, "é"]})
+        assert response.body == '{"status":"ok","data":[1,2.5,"é"]}'.encode("utf-8")
+
+    def test_render_datetime_and_timedelta(self):
+        """Test that datetimes render as ISO strings and timedeltas as seconds."""
+        created = datetime(2024, 1, 2, 3, 4, 5)
+        response = JSONResponse({"created": created, "timeout": timedelta(minutes=2)})
+        assert json.loads(response.body) == {"created": created.isoformat(), "timeout": 120.0}
+
+    def test_render_datetime_subclass(self):
+        """Test that datetime subclasses, which orjson hands to json_serializer, render as ISO strings."""
+        response = JSONResponse({"created": _Timestamp(2024, 1, 2)})
+        assert json.loads(response.body) == {"created": "2024-01-02T00:00:00"}
+
+    def test_render_numpy_values(self):
+        """Test that numpy scalars and arrays render as plain JSON numbers."""
+        response = JSONResponse({"distance": np.float32(0.5), "vector": np.array([1.0, 2.0], dtype=np.float32)})
+        assert json.loads(response.body) == {"distance": 0.5, "vector": [1.0, 2.0]}
+
+    def test_render_non_finite_floats_as_null(self):
+        """Test that NaN and infinity render as null instead of invalid JSON."""
+        response = JSONResponse({"nan": float("nan"), "inf": float("inf")})
+        assert json.loads(response.body) == {"nan": None, "inf": None}
+
+
+class TestJsonSerializer:
+    """Test suite for json_serializer."""
+
+    def test_serialize_known_types(self):
+        """Test that timedeltas, their subclasses and datetime subclasses are serialized."""
+        assert json_serializer(timedelta(seconds=1.5)) == 1.5
+        assert json_serializer(_Timestamp(2024, 1, 2)) == "2024-01-02T00:00:00"
+        assert json_serializer(_Duration(seconds=1.5)) == 1.5
+
+    def test_serialize_unknown_type(self):
+        """Test that unsupported types raise TypeError."""
+        with pytest.raises(TypeError):
+            json_serializer(object())
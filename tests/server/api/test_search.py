@@ -0,0 +1,306 @@
+import threading
+from queue import Full
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from embedder.store.store import RelevantCollection, TextInputWithDistance
+from embedder.text import TextInput
+from server.api import search as search_module
+from server.api.search import (
+    SearchResult,
+    _cut_line_into_chunks,
+    _embed_user_query,
+    _get_cached_file_content,
+    _get_extended_search_result_indices,
+    _get_query_vectors,
+    _read_extended_file_content,
+    _wait_for_embeddings,
+    evict_file_content,
+    most_relevant_sources,
+    notify_query_embeddings_stored,
+    search,
+)
+from server.error import MCPError
+from server.read.reader import SourceType
+
+
+@pytest.fixture(autouse=True)
+def clear_search_caches():
+    search_module._query_vectors_cache.clear()
+    search_module._file_content_cache.clear()
+    yield
+    search_module._query_vectors_cache.clear()
+    search_module._file_content_cache.clear()
+
+
+def _data_source_map_with_vectors() -> MagicMock:
+    """Data source map returning a distinct vector for every query id it is asked about."""
+    data_source_map = MagicMock()
+
+    def get_text_input_by_id(query_id, source):
+        ti = TextInput(query_id, {"id": query_id})
+        ti._vec = np.full(3, len(query_id), dtype=np.float32)
+        return ti
+
+    data_source_map.get_text_input_by_id.side_effect = get_text_input_by_id
+    return data_source_map
+
+
+class TestGetQueryVectors:
+    """Test suite for the query embeddings cache."""
+
+    @patch("server.api.search._wait_for_embeddings", return_value=True)
+    @patch("server.api.search._embed_user_query", return_value=["query-1", "query-22"])
+    def test_repeated_query_skips_embedder(self, mock_embed, mock_wait):
+        """Test that a repeated query reuses the cached vectors."""
+        data_source_map = _data_source_map_with_vectors()
+
+        first = _get_query_vectors("what is brag", MagicMock(), data_source_map)
+        second = _get_query_vectors("what is brag", MagicMock(), data_source_map)
+
+        assert len(first) == 2
+        assert second is first
+        mock_embed.assert_called_once()
+        mock_wait.assert_called_once()
+
+    @patch("server.api.search.QUERY_VECTORS_CACHE_SIZE", MagicMock(value=1))
+    @patch("server.api.search._wait_for_embeddings", return_value=True)
+    @patch("server.api.search._embed_user_query", return_value=["query-1"])
+    def test_cache_evicts_least_recently_used(self, mock_embed, mock_wait):
+        """Test that the cache keeps at most QUERY_VECTORS_CACHE_SIZE queries."""
+        data_source_map = _data_source_map_with_vectors()
+
+        _get_query_vectors("first", MagicMock(), data_source_map)
+        _get_query_vectors("second", MagicMock(), data_source_map)
+        _get_query_vectors("first", MagicMock(), data_source_map)
+
+        assert mock_embed.call_count == 3
+        assert list(search_module._query_vectors_cache) == ["first"]
+
+    @patch("server.api.search._wait_for_embeddings", return_value=True)
+    @patch("server.api.search._embed_user_query", return_value=["query-1"])
+    def test_incomplete_embeddings_not_cached(self, mock_embed, mock_wait):
+        """Test that queries with missing vectors are embedded again next time."""
+        data_source_map = MagicMock()
+        data_source_map.get_text_input_by_id.return_value = None
+
+        assert _get_query_vectors("query", MagicMock(), data_source_map) == []
+        assert "query" not in search_module._query_vectors_cache
+
+    @patch("server.api.search._wait_for_embeddings", return_value=False)
+    @patch("server.api.search._embed_user_query", return_value=["query-1"])
+    def test_timeout_raises(self, mock_embed, mock_wait):
+        """Test that an embedding timeout is reported and nothing is cached."""
+        with pytest.raises(MCPError):
+            _get_query_vectors("query", MagicMock(), MagicMock())
+        assert "query" not in search_module._query_vectors_cache
+
+
+class TestWaitForEmbeddings:
+    """Test suite for waiting on user query embeddings."""
+
+    def test_woken_up_by_storage_notification(self):
+        """Test that waiters return as soon as the storage thread signals the query ids."""
+        query_ids = _embed_user_query("what is brag", MagicMock())
+        data_source_map = MagicMock()
+
+        timer = threading.Timer(0.05, notify_query_embeddings_stored, args=(query_ids,))
+        timer.start()
+        try:
+            assert _wait_for_embeddings(query_ids, data_source_map) is True
+        finally:
+            timer.cancel()
+        data_source_map.get_text_input_by_id.assert_not_called()
+        assert not search_module._query_stored_events
+
+    @patch("server.api.search.SEARCH_PROCESSING_TIMEOUT_SECONDS", MagicMock(value=0.01))
+    def test_falls_back_to_store_without_notification(self):
+        """Test that embeddings stored without a notification are still found once the wait expires."""
+        query_ids = _embed_user_query("what is brag", MagicMock())
+        data_source_map = MagicMock()
+
+        assert _wait_for_embeddings(query_ids, data_source_map) is True
+
+        data_source_map.get_text_input_by_id.return_value = None
+        query_ids = _embed_user_query("what is brag", MagicMock())
+        assert _wait_for_embeddings(query_ids, data_source_map) is False
+        assert not search_module._query_stored_events
+
+    def test_events_dropped_when_submission_fails(self):
+        """Test that a full embedder queue does not leave query events behind."""
+        embedder_read_queue = MagicMock()
+        embedder_read_queue.put_many.side_effect = Full("Queue remained full after maximum retry attempts")
+
+        with pytest.raises(Full):
+            _embed_user_query("what is brag", embedder_read_queue)
+        assert not search_module._query_stored_events
+
+
+class TestFileContentCache:
+    """Test suite for the file content cache used to extend search results."""
+
+    @patch("server.api.search.FILE_CONTENT_CACHE_SIZE", MagicMock(value=2))
+    def test_cache_is_bounded(self, tmp_path):
+        """Test that the least recently used file is evicted once the cache is full."""
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"file{i}.txt"
+            path.write_text(f"content {i}")
+            paths.append(str(path))
+
+        assert _get_cached_file_content(paths[0], SourceType.LOCAL_TEXT_FILE) == "content 0"
+        _get_cached_file_content(paths[1], SourceType.LOCAL_TEXT_FILE)
+        _get_cached_file_content(paths[0], SourceType.LOCAL_TEXT_FILE)
+        _get_cached_file_content(paths[2], SourceType.LOCAL_TEXT_FILE)
+
+        assert list(search_module._file_content_cache) == [paths[0], paths[2]]
+
+    def test_evict_file_content(self, tmp_path):
+        """Test that evicted files are read again on the next access."""
+        path = tmp_path / "file.txt"
+        path.write_text("old content")
+
+        assert _get_cached_file_content(str(path), SourceType.LOCAL_TEXT_FILE) == "old content"
+        path.write_text("new content")
+        assert _get_cached_file_content(str(path), SourceType.LOCAL_TEXT_FILE) == "old content"
+
+        evict_file_content(str(path))
+        assert _get_cached_file_content(str(path), SourceType.LOCAL_TEXT_FILE) == "new content"
+
+
+class TestReadExtendedFileContent:
+    """Test suite for _read_extended_file_content."""
+
+    def test_text_file_read_by_range_without_caching(self, tmp_path):
+        """Test that plain text windows are read directly and clamped to the end of the file."""
+        path = tmp_path / "file.txt"
+        path.write_text("0123456789")
+
+        result = _read_extended_file_content(4, 20, str(path), "source", SourceType.LOCAL_TEXT_FILE, 0.5)
+
+        assert (result.text, result.start_index, result.end_index) == ("456789", 4, 10)
+        assert not search_module._file_content_cache
+
+    def test_text_file_read_around_anchor(self, tmp_path):
+        """Test that a window is read from the byte offset of the matched chunk."""
+        path = tmp_path / "file.txt"
+        path.write_text("ünïcödé\nmatched line\n", encoding="utf-8")
+
+        result = _read_extended_file_content(2, 14, str(path), "source", SourceType.LOCAL_TEXT_FILE, 0.5, (8, 12))
+
+        assert result.text == "ïcödé\nmatche"
+
+    def test_window_past_end_of_file(self, tmp_path):
+        """Test that a window starting after the end of the file yields no result."""
+        path = tmp_path / "file.txt"
+        path.write_text("0123456789")
+
+        assert _read_extended_file_content(12, 20, str(path), "source", SourceType.LOCAL_TEXT_FILE, 0.5) is None
+
+
+def _text_input_with_distance(start_index: int, end_index: int, distance: float) -> TextInputWithDistance:
+    return TextInputWithDistance("text", {"start_index": start_index, "end_index": end_index}, np.zeros(3), distance)
+
+
+@patch("server.api.search.SEARCH_CONTEXT_EXTENSION_CHARACTERS", MagicMock(value=10))
+class TestGetExtendedSearchResultIndices:
+    """Test suite for merging extended search result windows."""
+
+    def test_empty(self):
+        """Test that no text inputs yield no windows."""
+        assert _get_extended_search_result_indices([]) == []
+
+    def test_single_window_clamped_at_zero(self):
+        """Test that a window is extended on both sides and never starts before 0."""
+        assert _get_extended_search_result_indices([_text_input_with_distance(5, 20, 0.5)]) == [(0, 30, 0.5)]
+
+    def test_overlapping_windows_merged_with_best_distance(self):
+        """Test that overlapping windows merge into one that keeps the smallest distance."""
+        text_inputs = [
+            _text_input_with_distance(100, 120, 0.8),
+            _text_input_with_distance(50, 70, 0.3),
+            _text_input_with_distance(75, 90, 0.6),
+        ]
+        assert _get_extended_search_result_indices(text_inputs) == [(40, 130, 0.3)]
+
+    def test_disjoint_windows_keep_their_own_distance(self):
+        """Test that separate windows are kept apart, each with its own distance."""
+        text_inputs = [
+            _text_input_with_distance(500, 520, 0.2),
+            _text_input_with_distance(100, 120, 0.9),
+        ]
+        assert _get_extended_search_result_indices(text_inputs) == [(90, 130, 0.9), (490, 530, 0.2)]
+
+
+@patch("server.api.search.SEARCH_CHUNK_CHARACTER_LIMIT", MagicMock(value=10))
+class TestCutLineIntoChunks:
+    """Test suite for splitting query lines into chunks."""
+
+    def test_blank_line(self):
+        """Test that blank lines produce no chunks."""
+        assert _cut_line_into_chunks("") == []
+        assert _cut_line_into_chunks(" \t ") == []
+
+    def test_short_line(self):
+        """Test that a line under the limit is a single stripped chunk spanning the whole line."""
+        chunks = _cut_line_into_chunks("  hello ", base_index=5)
+        assert [(c.start_index, c.end_index, c.text) for c in chunks] == [(5, 13, "hello")]
+
+    def test_long_line_breaks_at_spaces(self):
+        """Test that long lines break at the last space and skip whitespace between chunks."""
+        chunks = _cut_line_into_chunks("alpha beta  \tgamma delta")
+        assert [(c.start_index, c.end_index, c.text) for c in chunks] == [
+            (0, 5, "alpha"),
+            (6, 11, "beta"),
+            (13, 18, "gamma"),
+            (19, 24, "delta"),
+        ]
+
+
+def _search_result(distance: float) -> SearchResult:
+    return SearchResult("text", "source", SourceType.LOCAL_TEXT_FILE, 0, 4, distance)
+
+
+class TestSearch:
+    """Test suite for search."""
+
+    @patch("server.api.search._search_vector_in_data_source")
+    @patch("server.api.search._get_query_vectors")
+    def test_results_ranked_before_pagination(self, mock_get_query_vectors, mock_search_vector):
+        """Test that results of all query lines are ranked by distance before offset and limit apply."""
+        mock_get_query_vectors.return_value = [np.zeros(3, dtype=np.float32), np.ones(3, dtype=np.float32)]
+        mock_search_vector.side_effect = [
+            [_search_result(0.5), _search_result(0.9), _search_result(0.3)],
+            [_search_result(0.1), _search_result(0.7)],
+        ]
+
+        results = search("line one\nline two", MagicMock(), MagicMock(), limit=2, offset=1)
+
+        assert [result.distance for result in results] == [0.3, 0.5]
+
+
+class TestMostRelevantSources:
+    """Test suite for most_relevant_sources."""
+
+    @patch("server.api.search._get_query_vectors")
+    def test_merges_results_of_all_query_lines(self, mock_get_query_vectors):
+        """Test that every query line is searched and the per-collection statistics are merged."""
+        mock_get_query_vectors.return_value = [np.zeros(3, dtype=np.float32), np.ones(3, dtype=np.float32)]
+        data_source_map = MagicMock()
+
+        def get_relevant_sources(vector, limit, sources=None):
+            if vector[0] == 0:
+                return [RelevantCollection("a", 0.2, 0.4, 2), RelevantCollection("b", 0.5, 0.5, 1)]
+            return [RelevantCollection("a", 0.1, 0.1, 2)]
+
+        data_source_map.get_relevant_sources.side_effect = get_relevant_sources
+
+        result = most_relevant_sources("line one\nline two", MagicMock(), data_source_map, limit=5)
+
+        assert data_source_map.get_relevant_sources.call_count == 2
+        assert result == [
+            {"collection": "a", "min_distance": 0.1, "avg_distance": pytest.approx(0.25), "count": 4},
+            {"collection": "b", "min_distance": 0.5, "avg_distance": 0.5, "count": 1},
+        ]
@@ -271,6 +271,50 @@ class TestTextReader:
         for chunk in chunks_large:
             assert len(chunk.text) <= 10000
 
+    def test_read_range_matches_read(self):
+        """Test that read_range returns the same characters as slicing read, including multi-byte ones."""
+        content = "héllo wörld\nsecond line ✓\n" * 3
+        temp_file = self.create_temp_text_file(content)
+
+        reader = TextReader(temp_file)
+
+        assert reader.read_range(0, 5) == content[0:5]
+        assert reader.read_range(7, 30) == content[7:30]
+        assert reader.read_range(len(content) - 4, len(content) + 10) == content[-4:]
+        assert reader.read_range(len(content) + 5, len(content) + 10) == ""
+
+    def test_read_iter_records_byte_offsets(self):
+        """Test that chunks record the byte offset of their start, including after CRLF and multi-byte lines."""
+        temp_file = self.create_temp_text_file("")
+        with open(temp_file, "wb") as file:
+            file.write("héllo\r\nwörld wide\n\nend".encode("utf-8"))
+
+        reader = TextReader(temp_file, chunk_size_max=6)
+        chunks = list(reader.read_iter())
+
+        assert [(chunk.start_index, chunk.text, chunk.byte_start) for chunk in chunks] == [
+            (0, "héllo", 0),
+            (6, "wörld", 8),
+            (12, "wide", 15),
+            (18, "end", 21),
+        ]
+        assert reader.read()[18:21] == "end"
+
+    def test_read_range_with_anchor_matches_read(self):
+        """Test that reading around a chunk's byte offset returns the same characters as slicing read."""
+        content = "héllo wörld\nsecond line ✓\n" * 3
+        temp_file = self.create_temp_text_file(content)
+
+        reader = TextReader(temp_file)
+
+        for chunk in reader.read_iter():
+            anchor = (chunk.start_index, chunk.byte_start)
+            start_index = max(0, chunk.start_index - 7)
+            assert (
+                reader.read_range(start_index, chunk.end_index + 7, anchor)
+                == content[start_index : chunk.end_index + 7]
+            )
+
     def test_read_nonexistent_file(self):
         """Test reading nonexistent file raises appropriate error."""
         reader = TextReader("nonexistent_file.txt")
@@ -1,9 +1,26 @@
 from transcriber.interface import TranscriptionProvider  # noqa: F401
-from transcriber.parakeet import ParakeetProvider  # noqa: F401
-from transcriber.whisper import WhisperProvider  # noqa: F401
 
 from enum import Enum
 
+# Providers pull in their ML runtime (mlx, torch) on import, so they are only
+# loaded when first accessed: importing the package for TranscriptionProvider stays cheap
+_LAZY_PROVIDERS = {
+    "ParakeetProvider": "transcriber.parakeet",
+    "WhisperProvider": "transcriber.whisper",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_PROVIDERS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    provider = getattr(importlib.import_module(module_name), name)
+    globals()[name] = provider
+    return provider
+
+
 class TranscriberTypes(str, Enum):
     PARAKEET = "parakeet"
     WHISPER = "whisper"
@@ -22,7 +39,11 @@ def get_transcription_provider(
         TranscriptionProvider: Instance of the requested provider
     """
     if model_type == TranscriberTypes.PARAKEET:
+        from transcriber.parakeet import ParakeetProvider
+
         return ParakeetProvider()
     elif model_type == TranscriberTypes.WHISPER:
+        from transcriber.whisper import WhisperProvider
+
         return WhisperProvider()
     raise ValueError(f"Invalid model type: {model_type}")